@@ -0,0 +1,128 @@
+# batch.py
+import numpy as np
+
+from game_logic import DIRECTIONS, EMPTY, FORWARD, GameBoard
+
+
+# === BoardBatch Class ===
+class BoardBatch:
+    # Wiele plansz naraz jako tablica int8 o kształcie (n_boards, rows, cols);
+    # 0 oznacza puste pole, jak w GameBoard.cells
+
+    def __init__(self, cells):
+        cells = np.asarray(cells, dtype=np.int8)
+        if cells.ndim != 3:
+            raise ValueError("Expected an array of shape (n_boards, rows, cols)")
+        self.cells = cells
+
+    @classmethod
+    def empty(cls, n_boards, size=GameBoard.SIZE):
+        return cls(np.zeros((n_boards, size, size), dtype=np.int8))
+
+    @classmethod
+    def from_boards(cls, boards):
+        boards = list(boards)
+        size = boards[0].size if boards else GameBoard.SIZE
+        cells = np.empty((len(boards), size, size), dtype=np.int8)
+        for i, board in enumerate(boards):
+            cells[i] = np.frombuffer(board.cells, dtype=np.int8).reshape(size, size)
+        return cls(cells)
+
+    def to_board(self, i):
+        board = GameBoard(self.cells.shape[1])
+        for idx, value in enumerate(self.cells[i].ravel().tolist()):
+            board.set_index(idx, value)
+        return board
+
+    def __len__(self):
+        return self.cells.shape[0]
+
+    @property
+    def size(self):
+        return self.cells.shape[1]
+
+    def occupied(self):
+        return self.cells != EMPTY
+
+    def refill_empty(self, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        values = rng.integers(1, 10, size=self.cells.shape, dtype=np.int8)
+        np.copyto(self.cells, values, where=self.cells == EMPTY)
+
+    def is_board_empty(self):
+        return ~self.cells.any(axis=(1, 2))
+
+    def fill_ratio(self):
+        return self.occupied().mean(axis=(1, 2))
+
+    @staticmethod
+    def values_match(val1, val2):
+        # Maska par "równe lub dopełnienie do 10", tylko dla zajętych pól
+        return (val1 != EMPTY) & (val2 != EMPTY) & ((val1 == val2) | (val1.astype(np.int16) + val2 == 10))
+
+    def nearest(self, k):
+        # Wartość i odległość najbliższego zajętego pola w kierunku DIRECTIONS[k]
+        # dla każdego pola każdej planszy (0, 0 gdy brak)
+        dr, dc = DIRECTIONS[k]
+        cells = self.cells
+        n, rows, cols = cells.shape
+        values = np.zeros_like(cells)
+        steps = np.zeros(cells.shape, dtype=np.int32)
+
+        # Przesuwamy się warstwami przeciwnie do kierunku; każda warstwa
+        # korzysta z już policzonej warstwy sąsiedniej
+        if dr:
+            layers = range(rows - 2, -1, -1) if dr > 0 else range(1, rows)
+            src = slice(max(dc, 0), cols + min(dc, 0))
+            dst = slice(max(-dc, 0), cols + min(-dc, 0))
+            for r in layers:
+                nb_cells = cells[:, r + dr, src]
+                hit = nb_cells != EMPTY
+                values[:, r, dst] = np.where(hit, nb_cells, values[:, r + dr, src])
+                further = steps[:, r + dr, src]
+                steps[:, r, dst] = np.where(hit, 1, np.where(further > 0, further + 1, 0))
+        else:
+            layers = range(cols - 2, -1, -1) if dc > 0 else range(1, cols)
+            for c in layers:
+                nb_cells = cells[:, :, c + dc]
+                hit = nb_cells != EMPTY
+                values[:, :, c] = np.where(hit, nb_cells, values[:, :, c + dc])
+                further = steps[:, :, c + dc]
+                steps[:, :, c] = np.where(hit, 1, np.where(further > 0, further + 1, 0))
+        return values, steps
+
+    def match_masks(self, directions=range(len(DIRECTIONS))):
+        # (n_boards, len(directions), rows, cols): pole ma legalną parę w danym kierunku
+        masks = []
+        for k in directions:
+            values, _ = self.nearest(k)
+            masks.append(self.values_match(self.cells, values))
+        return np.stack(masks, axis=1)
+
+    def legal_move_counts(self):
+        # Każda para liczona raz: tylko kierunki "do przodu"
+        return self.match_masks(range(len(FORWARD))).sum(axis=(1, 2, 3))
+
+    def has_legal_move(self):
+        return self.legal_move_counts() > 0
+
+    def are_positions_connectable(self, pos1, pos2):
+        n = len(self)
+        row_diff = pos2.row - pos1.row
+        col_diff = pos2.col - pos1.col
+        if row_diff == 0 and col_diff == 0:
+            return np.ones(n, dtype=bool)
+        if row_diff != 0 and col_diff != 0 and abs(row_diff) != abs(col_diff):
+            return np.zeros(n, dtype=bool)
+
+        distance = max(abs(row_diff), abs(col_diff))
+        step_r = (row_diff > 0) - (row_diff < 0)
+        step_c = (col_diff > 0) - (col_diff < 0)
+        rows = pos1.row + step_r * np.arange(1, distance)
+        cols = pos1.col + step_c * np.arange(1, distance)
+        return ~self.cells[:, rows, cols].any(axis=1)
+
+    def is_match(self, pos1, pos2):
+        val1 = self.cells[:, pos1.row, pos1.col]
+        val2 = self.cells[:, pos2.row, pos2.col]
+        return self.values_match(val1, val2) & self.are_positions_connectable(pos1, pos2)
@@ -0,0 +1,215 @@
+# benchmark.py
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from engine import RULES, pick_refill_rows, refill_rows
+from game_logic import DIRECTIONS, GameBoard, Position
+from policies import GreedyPolicy
+from simulate import play_game
+
+DEFAULT_SIZES = (6, 32, 128)
+DEFAULT_DENSITIES = (0.25, 0.5, 0.9)
+
+
+def random_board(size, density, rng):
+    board = GameBoard(size)
+    for idx in range(size * size):
+        if rng.random() < density:
+            board.set_index(idx, rng.randint(1, 9))
+    return board
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    pick = lambda q: ordered[round(q * last)]
+    return {
+        "min": ordered[0],
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+        "mean": sum(ordered) / len(ordered),
+    }
+
+
+def measure(func, setup=None, repeat=30, min_time=0.002):
+    # Czasy pojedynczego wywołania: repeat próbek po number wywołań;
+    # number dobierane tak, by próbka trwała co najmniej min_time
+    def sample(number):
+        args = [setup() for _ in range(number)] if setup else [None] * number
+        started = time.perf_counter()
+        if setup:
+            for arg in args:
+                func(arg)
+        else:
+            for _ in args:
+                func()
+        return time.perf_counter() - started
+
+    number = 1
+    while number < 1_000_000:
+        if sample(number) >= min_time:
+            break
+        number *= 2
+    samples = [sample(number) / number for _ in range(repeat)]
+    result = percentiles(samples)
+    result["calls"] = number * repeat
+    return result
+
+
+# === Benchmark Cases ===
+def board_cases(size, density, rng, tmpdir):
+    board = random_board(size, density, rng)
+    cells = size * size
+    pairs = [(board.position(rng.randrange(cells)), board.position(rng.randrange(cells))) for _ in range(256)]
+    state = {"i": 0}
+
+    def is_match():
+        state["i"] = (state["i"] + 1) & 255
+        board.is_match(*pairs[state["i"]])
+
+    yield "is_match", {}, is_match, None
+
+    last = size - 1
+    mid = size // 2
+    for k, (dr, dc) in enumerate(DIRECTIONS):
+        # Krótki promień: sąsiednie pole; długi: od krawędzi do krawędzi
+        start = Position(mid if dr == 0 else (0 if dr > 0 else last), mid if dc == 0 else (0 if dc > 0 else last))
+        short = Position(start.row + dr, start.col + dc)
+        far = Position(start.row + dr * last, start.col + dc * last)
+        for ray, end in (("short", short), ("long", far)):
+            yield ("are_positions_connectable", {"ray": ray, "direction": [dr, dc]},
+                   lambda end=end, start=start: board.are_positions_connectable(start, end), None)
+
+    yield "is_board_empty", {}, board.is_board_empty, None
+
+    yield "refill_empty", {}, lambda b: b.refill_empty(), board.copy
+
+    yield "pick_refill_rows", {}, lambda: pick_refill_rows(board), None
+
+    yield "refill_rows", {}, lambda b: refill_rows(b, pick_refill_rows(b), rng), board.copy
+
+    path = os.path.join(tmpdir, f"board_{size}_{density}.csv")
+    loaded = GameBoard(size)
+
+    def round_trip():
+        board.save_to_file(path)
+        loaded.load_from_file(path)
+
+    yield "save_load_csv", {}, round_trip, None
+
+
+def playout_cases(rng):
+    for mode, rules in RULES.items():
+        policy = GreedyPolicy(rng)
+        yield "playout", {"mode": mode, "policy": policy.name}, lambda rules=rules, policy=policy: play_game(rules, policy, rng), None
+
+
+def run(sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES, repeat=30, seed=0, only=None):
+    rng = random.Random(seed)
+    results = []
+
+    def record(name, params, func, setup, size=None, density=None):
+        if only and not any(pattern in name for pattern in only):
+            return
+        entry = {"name": name, "size": size, "density": density, "params": params}
+        entry.update(measure(func, setup, repeat))
+        results.append(entry)
+        print(f"{key_of(entry):70s} p50={entry['p50'] * 1e6:10.2f}us", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in sizes:
+            for density in densities:
+                for name, params, func, setup in board_cases(size, density, rng, tmpdir):
+                    record(name, params, func, setup, size, density)
+    for name, params, func, setup in playout_cases(rng):
+        record(name, params, func, setup)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "repeat": repeat,
+            "unit": "s",
+        },
+        "results": results,
+    }
+
+
+def key_of(entry):
+    params = ",".join(f"{k}={v}" for k, v in sorted(entry["params"].items()))
+    return f"{entry['name']}[{params}] size={entry['size']} density={entry['density']}"
+
+
+def compare(current, baseline, tolerance=0.25, metric="p50"):
+    # Regresja: metryka wolniejsza od bazowej o więcej niż tolerance
+    base = {key_of(entry): entry for entry in baseline["results"]}
+    report = []
+    for entry in current["results"]:
+        key = key_of(entry)
+        old = base.get(key)
+        if old is None or not old[metric]:
+            continue
+        ratio = entry[metric] / old[metric]
+        report.append({
+            "key": key,
+            "baseline": old[metric],
+            "current": entry[metric],
+            "ratio": ratio,
+            "regression": ratio > 1 + tolerance,
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the SumUp game core (no display needed)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DEFAULT_DENSITIES))
+    parser.add_argument("--repeat", type=int, default=30, help="liczba próbek na przypadek")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", help="uruchom tylko przypadki zawierające podane nazwy")
+    parser.add_argument("--output", help="zapisz wyniki JSON do pliku (domyślnie stdout)")
+    parser.add_argument("--baseline", help="porównaj z zapisanymi wynikami JSON")
+    parser.add_argument("--save-baseline", help="zapisz wyniki jako nowy plik bazowy")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dopuszczalne spowolnienie (0.25 = 25%%)")
+    parser.add_argument("--metric", default="p50", choices=("p50", "p90", "p99", "mean", "min"))
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.densities, args.repeat, args.seed, args.only)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        report = compare(results, baseline, args.tolerance, args.metric)
+        results["comparison"] = {"baseline": args.baseline, "metric": args.metric,
+                                 "tolerance": args.tolerance, "entries": report}
+        regressions = [entry for entry in report if entry["regression"]]
+        for entry in regressions:
+            print(f"REGRESSION {entry['key']}: {entry['ratio']:.2f}x {args.metric}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# engine.py
+import random
+
+from game_logic import GameBoard, VALUES
+
+MAX_ERRORS = 5
+MAX_RANDOMS = 6
+START_ROWS = 3
+REFILL_ROWS = 2
+
+REASON_WIN = "Gratulacje! Wyczyściłeś całą planszę!"
+REASON_ERRORS = "Przekroczono limit błędów."
+REASON_SNIPER = "Popełniono błąd. Koniec gry!"
+REASON_MOVES = "Wykorzystano wszystkie ruchy."
+REASON_TIME = "Czas minął!"
+REASON_STUCK = "Brak możliwych ruchów."
+# Kolejność ma znaczenie: indeks powodu zapisywany jest w dzienniku ruchów
+REASONS = (REASON_WIN, REASON_ERRORS, REASON_SNIPER, REASON_MOVES, REASON_TIME, REASON_STUCK)
+
+REFILL_OK = "ok"
+REFILL_LIMIT = "limit"
+REFILL_FULL = "full"
+
+
+# === Mode Rules ===
+class ModeRules:
+    def __init__(self, name, time_limit=None, max_moves=None, sudden_death=False,
+                 max_errors=MAX_ERRORS, max_randoms=MAX_RANDOMS):
+        self.name = name
+        self.time_limit = time_limit
+        self.max_moves = max_moves
+        self.sudden_death = sudden_death
+        self.max_errors = max_errors
+        self.max_randoms = max_randoms
+
+    def replace(self, **changes):
+        params = dict(self.__dict__)
+        params.update(changes)
+        return ModeRules(**params)
+
+
+RULES = {
+    "standard": ModeRules("standard"),
+    "timed": ModeRules("timed", time_limit=60),
+    "sniper": ModeRules("sniper", sudden_death=True),
+    "challenge": ModeRules("challenge", max_moves=30),
+}
+
+
+def fill_start_rows(board, rng=random):
+    # Wszystkie wartości jednym wywołaniem - powtarzalny strumień dla danego rng
+    count = min(START_ROWS, board.size) * board.size
+    for idx, value in enumerate(rng.choices(VALUES, k=count)):
+        board.set_index(idx, value)
+
+
+def pick_refill_rows(board):
+    # Dwa wiersze z największą liczbą pustych pól (liczniki utrzymywane przez planszę)
+    return board.emptiest_rows(REFILL_ROWS)
+
+
+def refill_rows(board, rows, rng=random):
+    # Wartości losowane z histogramu planszy sprzed dolosowania;
+    # zwraca listę (indeks, wartość) wstawionych pól
+    size = board.size
+    cells = board.cells
+    targets = [idx for i in rows for idx in range(i * size, (i + 1) * size) if not cells[idx]]
+    changes = list(zip(targets, board.sample_values(len(targets), rng)))
+    for idx, value in changes:
+        board.set_index(idx, value)
+    return changes
+
+
+def score_for(val1, val2):
+    return 5 if val1 == val2 else 10
+
+
+class MoveResult:
+    __slots__ = ("matched", "points", "values")
+
+    def __init__(self, matched, points, values):
+        self.matched = matched
+        self.points = points
+        self.values = values
+
+
+# === Game Session ===
+class GameSession:
+    # Stan i reguły jednej rozgrywki, bez żadnych widżetów. GUI, symulacje
+    # i inne interfejsy wywołują play/randomize/advance i czytają over/reason.
+
+    def __init__(self, mode_name="standard", board=None, rules=None, rng=None):
+        self.rules = rules or RULES[mode_name]
+        self.board = board if board is not None else GameBoard()
+        self.board.mode_name = mode_name
+        self.rng = rng or random
+        self.moves_used = 0
+        self.over = False
+        self.reason = None
+        self.journal = None  # opcjonalny journal.JournalWriter
+        self.history = None  # opcjonalny history.History (cofanie ruchów)
+        if self.rules.max_moves is not None and not hasattr(self.board, "moves_left"):
+            self.board.moves_left = self.rules.max_moves
+
+    @property
+    def mode_name(self):
+        return self.board.mode_name
+
+    @property
+    def won(self):
+        return self.over and self.reason == REASON_WIN
+
+    @property
+    def moves_left(self):
+        return getattr(self.board, "moves_left", None)
+
+    @property
+    def time_left(self):
+        if self.rules.time_limit is None:
+            return None
+        return max(0.0, self.rules.time_limit - self.board.elapsed_time)
+
+    def start(self):
+        fill_start_rows(self.board, self.rng)
+        if self.is_stuck():
+            self.finish(REASON_STUCK)
+
+    def finish(self, reason):
+        if not self.over:
+            self.over = True
+            self.reason = reason
+            if self.journal is not None:
+                self.journal.record_end(self.board, reason)
+
+    def play(self, pos1, pos2):
+        board = self.board
+        val1 = board.get_value(pos1.row, pos1.col)
+        val2 = board.get_value(pos2.row, pos2.col)
+        self.moves_used += 1
+
+        if board.is_match(pos1, pos2):
+            board.clear_positions(pos1, pos2)
+            points = score_for(val1, val2)
+            board.score += points
+            result = MoveResult(True, points, (val1, val2))
+        else:
+            board.errors += 1
+            result = MoveResult(False, 0, (val1, val2))
+
+        if self.rules.max_moves is not None:
+            board.moves_left -= 1
+        if self.journal is not None:
+            self.journal.record_match(board, pos1, pos2, result.matched)
+
+        if result.matched and board.is_board_empty():
+            self.finish(REASON_WIN)
+        elif not result.matched and board.errors >= self.rules.max_errors:
+            self.finish(REASON_ERRORS)
+        elif not result.matched and self.rules.sudden_death:
+            self.finish(REASON_SNIPER)
+        elif self.rules.max_moves is not None and board.moves_left <= 0:
+            self.finish(REASON_MOVES)
+        elif result.matched and self.is_stuck():
+            self.finish(REASON_STUCK)
+
+        if self.history is not None:
+            idx1 = board.index(pos1.row, pos1.col)
+            idx2 = board.index(pos2.row, pos2.col)
+            self.history.record(
+                [(idx1, val1, 0), (idx2, val2, 0)] if result.matched else [],
+                score=result.points, errors=0 if result.matched else 1,
+                moves_left=-1 if self.rules.max_moves is not None else 0,
+                move=True, ended=self.reason if self.over else None,
+            )
+        return result
+
+    def can_randomize(self):
+        return self.board.random_count < self.rules.max_randoms
+
+    def is_stuck(self):
+        # Martwa plansza, której nie da się już zmienić dolosowaniem
+        board = self.board
+        return board.is_dead() and (not self.can_randomize() or board.is_board_full())
+
+    def randomize(self):
+        if not self.can_randomize():
+            return REFILL_LIMIT
+        rows = pick_refill_rows(self.board)
+        if not rows:
+            return REFILL_FULL
+        changes = refill_rows(self.board, rows, self.rng)
+        self.board.random_count += 1
+        if self.journal is not None:
+            self.journal.record_refill(changes)
+        if self.is_stuck():
+            self.finish(REASON_STUCK)
+        if self.history is not None:
+            self.history.record([(idx, 0, value) for idx, value in changes], random_count=1,
+                                ended=self.reason if self.over else None)
+        return REFILL_OK
+
+    def undo(self):
+        if self.history is None or not self.history.undo(self):
+            return False
+        if self.journal is not None:
+            self.journal.record_undo(self.board, self.moves_used)
+        return True
+
+    def redo(self):
+        if self.history is None or not self.history.redo(self):
+            return False
+        if self.journal is not None:
+            self.journal.record_redo(self.board, self.moves_used)
+        return True
+
+    def advance(self, seconds):
+        # Upływ czasu gry; w trybie z limitem kończy rozgrywkę po jego przekroczeniu
+        self.board.elapsed_time += seconds
+        limit = self.rules.time_limit
+        if limit is not None and self.board.elapsed_time >= limit:
+            self.finish(REASON_TIME)
+
+    def summary(self):
+        return {
+            "mode": self.mode_name,
+            "won": self.won,
+            "reason": self.reason,
+            "score": self.board.score,
+            "errors": self.board.errors,
+            "random_count": self.board.random_count,
+            "moves": self.moves_used,
+            "elapsed_time": self.board.elapsed_time,
+        }
@@ -1,18 +1,50 @@
 import csv
+import heapq
 import random
-# === Block Class ===
-class Block:
-    def __init__(self, value=None):
-        self.value = value
+from array import array
 
-    def __str__(self):
-        return str(self.value) if self.value is not None else ""
+EMPTY = 0
+VALUES = range(1, 10)
+
+# Kierunki (wiersz, kolumna); pierwsze cztery to kierunki "do przodu",
+# kolejne cztery to ich przeciwieństwa w tej samej kolejności
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1), (0, -1), (-1, 0), (-1, -1), (-1, 1))
+FORWARD = DIRECTIONS[:4]
+OPPOSITE = (4, 5, 6, 7, 0, 1, 2, 3)
+
+
+_GEOMETRY = {}
+
+
+def board_geometry(size):
+    # Krok w buforze i liczba pól do krawędzi dla każdego kierunku;
+    # wspólne dla wszystkich plansz danego rozmiaru
+    geometry = _GEOMETRY.get(size)
+    if geometry is None:
+        last = size - 1
+        steps = tuple(dr * size + dc for dr, dc in DIRECTIONS)
+        edges = tuple(
+            [
+                min(
+                    last - row if dr > 0 else row if dr < 0 else size,
+                    last - col if dc > 0 else col if dc < 0 else size,
+                )
+                for row in range(size) for col in range(size)
+            ]
+            for dr, dc in DIRECTIONS
+        )
+        geometry = _GEOMETRY[size] = (steps, edges)
+    return geometry
+
+
+def values_match(val1, val2):
+    return val1 == val2 or val1 + val2 == 10
 
-    def is_empty(self):
-        return self.value is None
 
 # === Position Class ===
 class Position:
+    __slots__ = ("row", "col")
+
     def __init__(self, row, col):
         self.row = row
         self.col = col
@@ -20,30 +52,294 @@ class Position:
     def __eq__(self, other):
         return self.row == other.row and self.col == other.col
 
+    def __hash__(self):
+        return hash((self.row, self.col))
+
+    def __repr__(self):
+        return f"Position({self.row}, {self.col})"
+
 # === GameBoard Class ===
 class GameBoard:
     SIZE = 6
+    # Tryb kontrolny: każde zapytanie o połączenie porównuje indeks z przejściem po polach
+    CHECK_INDEX = False
 
-    def __init__(self):
-        self.board = [[Block(None) for _ in range(self.SIZE)] for _ in range(self.SIZE)]
+    def __init__(self, size=None):
+        self.size = size or self.SIZE
+        # Plansza jako płaski bufor: jeden bajt na pole, 0 = puste pole
+        self.cells = array("b", bytes(self.size * self.size))
+        self._reset_counters()
+        self._reset_indexes()
+        self._listeners = []
         self.score = 0
         self.random_count = 0
         self.errors = 0
         self.elapsed_time = 0
         self.mode_name = "standard"
 
+    def _reset_counters(self):
+        # Histogram wartości (indeks 0 = puste pola) i liczba pustych pól w każdym
+        # wierszu; aktualizowane przy każdej zmianie pola, przeliczane tylko
+        # przy podmianie całego bufora
+        cells = self.cells
+        size = self.size
+        self.value_counts = array("i", [cells.count(value) for value in range(10)])
+        self.row_empty = array("i", [cells[row * size:(row + 1) * size].count(EMPTY) for row in range(size)])
+
+    @property
+    def occupied(self):
+        return len(self.cells) - self.value_counts[EMPTY]
+
+    def _reset_indexes(self):
+        self._steps, self._edges = board_geometry(self.size)
+        # Indeks ruchów budowany leniwie przy pierwszym zapytaniu,
+        # potem aktualizowany przy każdej zmianie pola
+        self._moves = None
+        self._nearest_index = None
+
+    def _resize(self, size):
+        self.size = size
+        self.cells = array("b", bytes(size * size))
+        self._reset_counters()
+        self._reset_indexes()
+
+    def copy(self):
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.cells = array("b", self.cells)
+        other.value_counts = array("i", self.value_counts)
+        other.row_empty = array("i", self.row_empty)
+        other._reset_indexes()
+        other._listeners = []
+        return other
+
+    def load_cells(self, raw, size):
+        # Podmiana całego bufora naraz; indeksy zostaną odbudowane leniwie
+        if size != self.size:
+            self._resize(size)
+        if self._listeners:
+            for idx, value in enumerate(array("b", bytes(raw))):
+                self._set_cell(idx, value)
+        else:
+            self.cells = array("b", bytes(raw))
+            self._reset_counters()
+            self._reset_indexes()
+
+    def index(self, row, col):
+        return row * self.size + col
+
+    def position(self, idx):
+        return Position(*divmod(idx, self.size))
+
     def get_value(self, row, col):
-        return self.board[row][col].value
+        return self.cells[row * self.size + col] or None
+
+    def set_value(self, row, col, value):
+        self._set_cell(row * self.size + col, value or EMPTY)
+
+    def add_listener(self, listener):
+        # listener(idx, old, new) wywoływany po każdej zmianie pola
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def set_index(self, idx, value):
+        # Zapis pola po indeksie (0 = puste): liczniki, indeks sąsiadów,
+        # zbiór ruchów i listenery pozostają zgodne z planszą
+        if not EMPTY <= value <= 9:
+            raise ValueError(f"cell value out of range: {value}")
+        cells = self.cells
+        old = cells[idx]
+        if old == value:
+            return
+        counts = self.value_counts
+        counts[old] -= 1
+        counts[value] += 1
+        if bool(old) != bool(value):
+            self.row_empty[idx // self.size] += -1 if value else 1
+            if self._nearest_index is not None:
+                self._update_nearest(idx, value)
+        if self._moves is None:
+            cells[idx] = value
+        else:
+            self._update_moves(idx, old, value)
+        for listener in self._listeners:
+            listener(idx, old, value)
+
+    _set_cell = set_index  # wewnętrzna nazwa używana w tym module
+
+    def _update_moves(self, idx, old, value):
+        cells = self.cells
+        moves = self._moves
+        # Sąsiedzi pola nie zależą od jego własnej zawartości
+        neighbors = [nearest[idx] for nearest in self._nearest_index]
+        if old:
+            for nb in neighbors:
+                if nb >= 0:
+                    moves.discard((idx, nb) if idx < nb else (nb, idx))
+        else:
+            # Zajęte pole przerywa linię pomiędzy sąsiadami po obu stronach
+            for a, b in zip(neighbors[:4], neighbors[4:]):
+                if a >= 0 and b >= 0:
+                    moves.discard((a, b) if a < b else (b, a))
+
+        cells[idx] = value
+
+        if value:
+            for nb in neighbors:
+                if nb >= 0 and values_match(value, cells[nb]):
+                    moves.add((idx, nb) if idx < nb else (nb, idx))
+        else:
+            for a, b in zip(neighbors[:4], neighbors[4:]):
+                if a >= 0 and b >= 0 and values_match(cells[a], cells[b]):
+                    moves.add((a, b) if a < b else (b, a))
+
+    def _walk_nearest(self, idx, k):
+        # Pierwsze zajęte pole w kierunku k (przejście po polach) albo -1
+        steps = self._edges[k][idx]
+        if steps <= 0:
+            return -1
+        step = self._steps[k]
+        stop = idx + step * steps + (1 if step > 0 else -1)
+        ray = self.cells[idx + step:stop if stop >= 0 else None:step].tobytes()
+        offset = len(ray) - len(ray.lstrip(b"\0"))
+        return idx + step * (offset + 1) if offset < len(ray) else -1
+
+    def _build_nearest_index(self):
+        # Dla każdego pola i każdego z 8 kierunków: najbliższe zajęte pole albo -1
+        cells = self.cells
+        n = len(cells)
+        index = []
+        for k in range(len(DIRECTIONS)):
+            step = self._steps[k]
+            edge = self._edges[k]
+            nearest = array("i", [-1]) * n
+            order = range(n - 1, -1, -1) if step > 0 else range(n)
+            for idx in order:
+                if edge[idx]:
+                    nb = idx + step
+                    nearest[idx] = nb if cells[nb] else nearest[nb]
+            index.append(nearest)
+        self._nearest_index = index
+        return index
+
+    def _update_nearest(self, idx, value):
+        # Pola "patrzące" na idx: od idx wstecz przez puste pola aż do
+        # pierwszego zajętego włącznie; dostają idx albo to, co za nim
+        index = self._nearest_index
+        steps, edges = self._steps, self._edges
+        for k, nearest in enumerate(index):
+            back = OPPOSITE[k]
+            count = edges[back][idx]
+            if not count:
+                continue
+            step = steps[back]
+            last = index[back][idx]
+            if last >= 0:
+                count = (last - idx) // step
+            stop = idx + step * count + (1 if step > 0 else -1)
+            target = idx if value else nearest[idx]
+            nearest[idx + step:stop if stop >= 0 else None:step] = array("i", [target]) * count
+
+    def _nearest(self, idx, k):
+        index = self._nearest_index
+        if index is None:
+            index = self._build_nearest_index()
+        return index[k][idx]
+
+    def _build_moves(self):
+        cells = self.cells
+        if self._nearest_index is None:
+            self._build_nearest_index()
+        by_value = [set() for _ in range(10)]
+        for idx, value in enumerate(cells):
+            if value:
+                by_value[value].add(idx)
+
+        moves = set()
+        for value in VALUES:
+            # Wartość bez pary (ani równej, ani dopełnienia do 10) nie tworzy ruchów
+            partners = len(by_value[value]) + (len(by_value[10 - value]) if value != 5 else 0)
+            if partners < 2:
+                continue
+            for idx in by_value[value]:
+                for k in range(len(FORWARD)):
+                    nb = self._nearest(idx, k)
+                    if nb >= 0 and values_match(value, cells[nb]):
+                        moves.add((idx, nb) if idx < nb else (nb, idx))
+        self._moves = moves
+        return moves
+
+    def legal_pairs(self):
+        moves = self._moves
+        if moves is None:
+            moves = self._build_moves()
+        return moves
+
+    def legal_moves(self):
+        size = self.size
+        return [
+            (Position(*divmod(a, size)), Position(*divmod(b, size)))
+            for a, b in sorted(self.legal_pairs())
+        ]
+
+    def has_legal_move(self):
+        return bool(self.legal_pairs())
+
+    def is_dead(self):
+        # Są liczby, ale żadna para nie pasuje (zbiór ruchów utrzymywany przyrostowo)
+        return self.occupied > 0 and not self.legal_pairs()
+
+    def is_board_full(self):
+        return self.occupied == len(self.cells)
+
+    @property
+    def fill_ratio(self):
+        return self.occupied / len(self.cells)
+
+    def value_distribution(self):
+        # Udział każdej wartości wśród zajętych pól, bez przeglądania planszy
+        occupied = self.occupied
+        return {value: self.value_counts[value] / occupied for value in VALUES if self.value_counts[value]}
+
+    def emptiest_rows(self, count):
+        # Wiersze z największą liczbą pustych pól; przy remisie niższy numer wiersza
+        row_empty = self.row_empty
+        return [row for row in heapq.nlargest(count, range(self.size), key=row_empty.__getitem__)
+                if row_empty[row]]
+
+    def sample_values(self, count, rng=random):
+        # Losowanie proporcjonalne do histogramu wartości (jak wybór z listy
+        # wszystkich zajętych pól); pusta plansza - rozkład równomierny
+        weights = self.value_counts[1:]
+        if not any(weights):
+            return rng.choices(VALUES, k=count)
+        return rng.choices(VALUES, weights=weights, k=count)
+
+    def stats(self):
+        return {
+            "fill_ratio": self.fill_ratio,
+            "values": {value: self.value_counts[value] for value in VALUES},
+            "row_empty": list(self.row_empty),
+        }
 
     def clear_positions(self, pos1, pos2):
-        self.board[pos1.row][pos1.col].value = None
-        self.board[pos2.row][pos2.col].value = None
+        self.set_value(pos1.row, pos1.col, None)
+        self.set_value(pos2.row, pos2.col, None)
 
-    def refill_empty(self):
-        for i in range(self.SIZE):
-            for j in range(self.SIZE):
-                if self.board[i][j].is_empty():
-                    self.board[i][j].value = random.randint(1, 9)
+    def empty_indices(self):
+        raw = self.cells.tobytes()
+        i = raw.find(EMPTY)
+        while i != -1:
+            yield i
+            i = raw.find(EMPTY, i + 1)
+
+    def refill_empty(self, rng=random):
+        empty = list(self.empty_indices())
+        for i, value in zip(empty, rng.choices(VALUES, k=len(empty))):
+            self._set_cell(i, value)
 
     def is_match(self, pos1, pos2):
         val1 = self.get_value(pos1.row, pos1.col)
@@ -57,44 +353,59 @@ class GameBoard:
 
         return val1 == val2 or val1 + val2 == 10
 
-    def are_positions_connectable(self, pos1, pos2):
+    def _direction(self, pos1, pos2):
         row_diff = pos2.row - pos1.row
         col_diff = pos2.col - pos1.col
+        if row_diff != 0 and col_diff != 0 and abs(row_diff) != abs(col_diff):
+            return None
+        return DIRECTIONS.index(((row_diff > 0) - (row_diff < 0), (col_diff > 0) - (col_diff < 0)))
 
-        if row_diff == 0:
-            step = 1 if col_diff > 0 else -1
-            for c in range(pos1.col + step, pos2.col, step):
-                if self.board[pos1.row][c].value is not None:
-                    return False
+    def _ray_connectable(self, pos1, pos2):
+        if pos1 == pos2:
             return True
+        k = self._direction(pos1, pos2)
+        if k is None:
+            return False
+        # Pola pomiędzy pozycjami tworzą wycinek bufora o stałym kroku
+        step = self._steps[k]
+        start = self.index(pos1.row, pos1.col)
+        stop = self.index(pos2.row, pos2.col)
+        return not any(self.cells[start + step:stop:step])
 
-        if col_diff == 0:
-            step = 1 if row_diff > 0 else -1
-            for r in range(pos1.row + step, pos2.row, step):
-                if self.board[r][pos1.col].value is not None:
-                    return False
+    def are_positions_connectable(self, pos1, pos2):
+        if pos1 == pos2:
             return True
+        k = self._direction(pos1, pos2)
+        if k is None:
+            return False
 
-        if abs(row_diff) == abs(col_diff):
-            step_r = 1 if row_diff > 0 else -1
-            step_c = 1 if col_diff > 0 else -1
-            r, c = pos1.row + step_r, pos1.col + step_c
-            while r != pos2.row and c != pos2.col:
-                if self.board[r][c].value is not None:
-                    return False
-                r += step_r
-                c += step_c
-            return True
+        # Połączenie istnieje, jeśli najbliższe zajęte pole leży na pos2 lub dalej
+        start = self.index(pos1.row, pos1.col)
+        stop = self.index(pos2.row, pos2.col)
+        nb = self._nearest(start, k)
+        result = nb < 0 or (nb - stop) * self._steps[k] >= 0
+
+        if self.CHECK_INDEX and result != self._ray_connectable(pos1, pos2):
+            raise AssertionError(f"Neighbor index out of sync for {pos1} -> {pos2}")
+        return result
 
-        return False
+    def is_board_empty(self):
+        return self.occupied == 0
 
     def save_to_file(self, filename="board.csv"):
+        # Format binarny (.sumup) albo CSV do importu/eksportu; błędy zapisu
+        # binarnego (OSError) trafiają do wywołującego
+        import savefile
+        if savefile.is_binary_path(filename):
+            savefile.save_binary(self, filename)
+            return
         try:
             with open(filename, "w", newline="") as f:
                 writer = csv.writer(f)
                 # Zapis planszy
-                for row in self.board:
-                    writer.writerow([block.value if block.value is not None else "" for block in row])
+                for i in range(self.size):
+                    row = self.cells[i * self.size:(i + 1) * self.size]
+                    writer.writerow([value if value else "" for value in row])
                 writer.writerow([])
 
                 # Zapis stanu gry
@@ -111,17 +422,27 @@ class GameBoard:
             print("Error saving file:", e)
 
     def load_from_file(self, filename="board.csv"):
+        # Uszkodzony plik binarny zgłasza SaveFormatError/OSError zamiast wypisania błędu
+        import savefile
+        if savefile.is_binary_path(filename):
+            savefile.load_binary(filename, board=self)
+            return
         try:
             with open(filename, "r") as f:
                 reader = csv.reader(f)
                 rows = list(reader)
 
-            for i in range(self.SIZE):
-                for j in range(self.SIZE):
+            # Rozmiar planszy wynika z liczby wierszy przed pustą linią
+            size = rows.index([]) if [] in rows else self.SIZE
+            if size != self.size:
+                self._resize(size)
+
+            for i in range(self.size):
+                for j in range(self.size):
                     val = rows[i][j]
-                    self.board[i][j].value = int(val) if val else None
+                    self.set_value(i, j, int(val) if val else None)
 
-            for row in rows[self.SIZE + 1:]:
+            for row in rows[self.size + 1:]:
                 if row and row[0] == "mode":
                     self.mode_name = row[1]
                 elif row and row[0] == "score":
@@ -140,5 +461,30 @@ class GameBoard:
         except Exception as e:
             print("Error loading file:", e)
 
-    def is_board_empty(self):
-        return all(block.value is None for row in self.board for block in row)
\ No newline at end of file
+
+def check_neighbor_index(trials=100, size=8, changes=50, seed=None):
+    """Porównuje indeks najbliższych sąsiadów z przejściem po polach na losowych planszach."""
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(trials):
+        board = GameBoard(size)
+        for idx in range(size * size):
+            board._set_cell(idx, rng.choice((EMPTY, EMPTY, *VALUES)))
+        board._build_nearest_index()
+        for _ in range(changes):
+            idx = rng.randrange(size * size)
+            board._set_cell(idx, rng.choice((EMPTY, *VALUES)))
+            for cell in range(size * size):
+                for k in range(len(DIRECTIONS)):
+                    expected = board._walk_nearest(cell, k)
+                    actual = board._nearest_index[k][cell]
+                    if expected != actual:
+                        raise AssertionError(
+                            f"Cell {board.position(cell)}, direction {DIRECTIONS[k]}: "
+                            f"index {actual}, ray walk {expected}"
+                        )
+                    checked += 1
+            pos1, pos2 = board.position(rng.randrange(size * size)), board.position(rng.randrange(size * size))
+            if board.are_positions_connectable(pos1, pos2) != board._ray_connectable(pos1, pos2):
+                raise AssertionError(f"Connectivity mismatch for {pos1} -> {pos2}")
+    return checked
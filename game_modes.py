@@ -1,21 +1,28 @@
 # game_modes.py
-import tkinter as tk
-import time
+from engine import REASON_TIME
+
+# Reguły trybów (limity, koniec gry) są w engine.GameSession;
+# klasy poniżej odpowiadają tylko za ich prezentację w GUI
 class GameMode:
+    # Które etykiety statusu GUI pokazuje w tym trybie
+    shows_clock = True
+    shows_moves = False
+    shows_errors = True
+
     def __init__(self, game_gui):
         self.gui = game_gui
 
     def start(self):
         pass
 
-    def on_match_failed(self):
+    def on_match(self):
         pass
 
-    def on_tick(self):
+    def on_match_failed(self):
         pass
 
     def is_game_over(self):
-        return False
+        return self.gui.session is not None and self.gui.session.over
 
 
 
@@ -26,54 +33,63 @@ class StandardMode(GameMode):
 
 
 class TimedMode(GameMode):
+    shows_clock = False  # tryb sam wyświetla odliczanie
+
     def __init__(self, gui):
         super().__init__(gui)
-        self.time_limit = 60  # 60 sekund
+        self.time_limit = gui.session.rules.time_limit
 
     def start(self):
-        self.start_time = time.time()
+        # Odliczanie co sekundę i dokładny termin końca, oba w czasie gry
+        self.gui.scheduler.every(1.0, self.show_remaining)
+        self.gui.scheduler.at(self.time_limit, self.time_up)
+        self.show_remaining(self.gui.board.elapsed_time)
 
-    def on_tick(self):
-        elapsed = time.time() - self.start_time
+    def show_remaining(self, elapsed):
         remaining = max(0, self.time_limit - int(elapsed))
-        self.gui.time_label.config(text=f"Czas: 00:{remaining:02}")
-        if remaining <= 0:
-            self.gui.stop_game("Czas minął!")
+        self.gui.set_label(self.gui.time_label, f"Czas: 00:{remaining:02}")
+
+    def time_up(self, elapsed):
+        self.gui.stop_game(REASON_TIME)
 
 
 
 
 class SniperMode(GameMode):
+    shows_errors = False
+
     def start(self):
-        self.gui.error_label.pack_forget()
+        self.gui.show_label(self.gui.error_label, False)
 
-    def on_match_failed(self):
-        self.gui.stop_game("Popełniono błąd. Koniec gry!")
-        
 
 
 
 
 
 class ChallengeMode(GameMode):
-    def __init__(self, gui):
-        super().__init__(gui)
-        self.moves_left = gui.board.moves_left if hasattr(gui.board, "moves_left") else 30
-        gui.board.moves_left = self.moves_left
+    shows_moves = True
+
+    @property
+    def moves_left(self):
+        return self.gui.board.moves_left
 
     def start(self):
-        self.gui.move_label.config(text=f"Ruchy: {self.moves_left}/30")
-        self.gui.move_label.pack(side=tk.LEFT, padx=10)
+        self._show_moves()
+        self.gui.show_label(self.gui.move_label, True)
 
     def on_match_failed(self):
-        self._decrement_moves()
+        self._show_moves()
 
     def on_match(self):
-        self._decrement_moves()
-
-    def _decrement_moves(self):
-        self.moves_left -= 1
-        self.gui.board.moves_left = self.moves_left  # aktualizacja planszy
-        self.gui.move_label.config(text=f"Ruchy: {self.moves_left}/30")
-        if self.moves_left <= 0:
-            self.gui.stop_game("Wykorzystano wszystkie ruchy.")
+        self._show_moves()
+
+    def _show_moves(self):
+        self.gui.set_label(self.gui.move_label, f"Ruchy: {self.moves_left}/{self.gui.session.rules.max_moves}")
+
+
+MODES = {
+    "standard": StandardMode,
+    "timed": TimedMode,
+    "sniper": SniperMode,
+    "challenge": ChallengeMode,
+}
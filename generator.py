@@ -0,0 +1,248 @@
+# generator.py
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import RULES, START_ROWS
+from game_logic import DIRECTIONS, GameBoard, VALUES, board_geometry
+from savefile import ARCHIVE_EXTENSION, ArchiveWriter
+from solver import Solver
+
+MAX_ATTEMPTS = 200
+SOLVER_NODES = 5000
+MAX_CHUNK = 500
+
+METHOD_REVERSE = "reverse"  # budowa od końca z gotowym rozwiązaniem
+METHOD_RANDOM = "random"    # losowe pola, odsiew solverem
+METHODS = (METHOD_REVERSE, METHOD_RANDOM)
+
+
+def stream_seed(seed, index):
+    # Niezależny, powtarzalny strumień dla każdej planszy: ten sam wynik
+    # niezależnie od liczby procesów i kolejności generowania
+    digest = hashlib.sha256(f"{seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def board_rng(seed, index=0):
+    return random.Random(stream_seed(seed, index))
+
+
+def daily_seed(day, mode="standard"):
+    return f"daily:{day.isoformat()}:{mode}"
+
+
+def random_cells(rng, size, rows=START_ROWS):
+    # Całe wiersze startowe jednym wywołaniem, reszta pusta
+    count = min(rows, size) * size
+    return bytes(rng.choices(VALUES, k=count)) + bytes(size * size - count)
+
+
+def build_solvable(rng, size, rows=START_ROWS):
+    # Pary wstawiane w puste pola, które się "widzą" (między nimi same puste);
+    # zdejmowanie ich w odwrotnej kolejności jest poprawnym rozwiązaniem.
+    # Zwraca (pola, rozwiązanie) albo None, gdy obszaru nie da się domknąć.
+    region = min(rows, size) * size
+    steps, edges = board_geometry(size)
+    cells = bytearray(size * size)
+    placed = []
+    for _ in range(region // 2):
+        empty = [i for i in range(region) if not cells[i]]
+        rng.shuffle(empty)
+        for a in empty:
+            options = []
+            for k in range(len(DIRECTIONS)):
+                b = a
+                for _ in range(edges[k][a]):
+                    b += steps[k]
+                    if b >= region or cells[b]:
+                        break
+                    options.append(b)
+            if options:
+                break
+        else:
+            return None
+        b = rng.choice(options)
+        value = rng.choice(VALUES)
+        cells[a] = value
+        cells[b] = rng.choice((value, 10 - value))
+        placed.append((min(a, b), max(a, b)))
+    return bytes(cells), placed[::-1]
+
+
+def replay_solution(board, solution):
+    # Sprawdza rozwiązanie na kopii; zwraca średnią liczbę dostępnych ruchów
+    # po drodze (miara rozgałęzienia) albo None, gdy któryś ruch jest nielegalny
+    board = board.copy()
+    branching = 0
+    for a, b in solution:
+        pairs = board.legal_pairs()
+        if (a, b) not in pairs:
+            return None
+        branching += len(pairs)
+        board.set_index(a, 0)
+        board.set_index(b, 0)
+    if not board.is_board_empty():
+        return None
+    return branching / len(solution) if solution else 0.0
+
+
+def rate(board, solver):
+    # Liczba węzłów solvera to miara trudności; przy przekroczeniu budżetu
+    # zapisywany jest sam budżet
+    result = solver.solve(board)
+    nodes = result.nodes if result.status != "unknown" else solver.max_nodes
+    return result, nodes
+
+
+def generate_puzzle(seed, index, size=GameBoard.SIZE, rows=START_ROWS, method=METHOD_REVERSE,
+                    solver_nodes=SOLVER_NODES, min_branching=0.0, max_branching=None, min_nodes=0,
+                    mode="standard", solver=None):
+    # Pierwsza kandydatka ze strumienia (seed, index), która przechodzi filtry
+    rng = board_rng(seed, index)
+    solver = solver or Solver(max_nodes=solver_nodes, table_size=solver_nodes)
+    board = GameBoard(size)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        if method == METHOD_REVERSE:
+            built = build_solvable(rng, size, rows)
+            if built is None:
+                continue
+            cells, solution = built
+            board.load_cells(cells, size)
+            result, nodes = rate(board, solver) if solver_nodes else (None, 0)
+        else:
+            board.load_cells(random_cells(rng, size, rows), size)
+            result, nodes = rate(board, solver)
+            if result.status != "solved":
+                continue
+            solution = [(board.index(p.row, p.col), board.index(q.row, q.col)) for p, q in result.moves]
+
+        branching = replay_solution(board, solution)
+        if branching is None:
+            raise AssertionError(f"Generated solution does not clear board {seed}:{index}")
+        if branching < min_branching or (max_branching is not None and branching > max_branching):
+            continue
+        if nodes < min_nodes:
+            continue
+        board.mode_name = mode
+        return board, {
+            "seed": str(seed),
+            "index": index,
+            "mode": mode,
+            "attempts": attempt,
+            "moves": len(solution),
+            "branching": round(branching, 3),
+            "nodes": nodes,
+            "solution": [list(move) for move in solution],
+        }
+    return None, None
+
+
+def run_chunk(task):
+    jobs, options = task
+    solver_nodes = options.get("solver_nodes", SOLVER_NODES)
+    solver = Solver(max_nodes=solver_nodes, table_size=solver_nodes) if solver_nodes else None
+    results = []
+    for seed, index in jobs:
+        board, info = generate_puzzle(seed, index, solver=solver, **options)
+        results.append((board.cells.tobytes() if board is not None else None, info))
+    return results
+
+
+def generate_pack(jobs, workers=None, **options):
+    # jobs: lista (seed, index); wynik w tej samej kolejności, None dla
+    # pozycji, których nie udało się wygenerować w MAX_ATTEMPTS próbach
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, min(MAX_CHUNK, -(-len(jobs) // (workers * 8))))
+    tasks = [(jobs[i:i + chunk], options) for i in range(0, len(jobs), chunk)]
+    if workers == 1:
+        parts = map(run_chunk, tasks)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        parts = executor.map(run_chunk, tasks)
+    size = options.get("size", GameBoard.SIZE)
+    mode = options.get("mode", "standard")
+    try:
+        for part in parts:
+            for raw, info in part:
+                if raw is None:
+                    yield None, None
+                    continue
+                board = GameBoard(size)
+                board.load_cells(raw, size)
+                board.mode_name = mode
+                yield board, info
+    finally:
+        if workers != 1:
+            executor.shutdown()
+
+
+def write_pack(filename, puzzles, meta=None):
+    # Plansze w archiwum .sumupa, opis (trudność, rozwiązania) w pliku .json obok
+    entries = []
+    with ArchiveWriter(filename) as writer:
+        for board, info in puzzles:
+            if board is None:
+                continue
+            writer.add(board)
+            entries.append(info)
+    manifest = dict(meta or {})
+    manifest["count"] = len(entries)
+    manifest["puzzles"] = entries
+    with open(os.path.splitext(filename)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return len(entries)
+
+
+def daily_challenge(mode="standard", day=None, **options):
+    day = day or datetime.date.today()
+    return generate_puzzle(daily_seed(day, mode), 0, mode=mode, **options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator of solvable SumUp puzzle packs")
+    parser.add_argument("--count", type=int, default=1000, help="liczba plansz w paczce")
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--daily", default=None, metavar="YYYY-MM-DD",
+                        help="paczka wyzwań dziennych od tej daty (--count dni)")
+    parser.add_argument("--mode", default="standard", choices=sorted(RULES))
+    parser.add_argument("--size", type=int, default=GameBoard.SIZE)
+    parser.add_argument("--rows", type=int, default=START_ROWS, help="liczba zapełnionych wierszy")
+    parser.add_argument("--method", default=METHOD_REVERSE, choices=METHODS)
+    parser.add_argument("--solver-nodes", type=int, default=SOLVER_NODES,
+                        help="budżet solvera na ocenę trudności (0 = bez oceny)")
+    parser.add_argument("--min-branching", type=float, default=0.0)
+    parser.add_argument("--max-branching", type=float, default=None)
+    parser.add_argument("--min-nodes", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    parser.add_argument("--output", default="pack" + ARCHIVE_EXTENSION)
+    args = parser.parse_args(argv)
+
+    if args.daily:
+        start = datetime.date.fromisoformat(args.daily)
+        jobs = [(daily_seed(start + datetime.timedelta(days=i), args.mode), 0) for i in range(args.count)]
+    else:
+        jobs = [(args.seed, i) for i in range(args.count)]
+    options = {
+        "size": args.size, "rows": args.rows, "method": args.method, "mode": args.mode,
+        "solver_nodes": args.solver_nodes, "min_branching": args.min_branching,
+        "max_branching": args.max_branching, "min_nodes": args.min_nodes,
+    }
+
+    started = time.perf_counter()
+    written = write_pack(args.output, generate_pack(jobs, args.workers, **options),
+                         {"seed": args.seed, "daily": args.daily, **options})
+    wall = time.perf_counter() - started
+    sys.stderr.write(f"{written}/{len(jobs)} boards -> {args.output} in {wall:.2f}s "
+                     f"({written / wall if wall else 0:.0f}/s)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,60 @@
 import tkinter as tk
 from game_logic import GameBoard, Position
-from PIL import Image, ImageTk
-from tkinter import messagebox, filedialog
-import random
 import time
-from game_modes import StandardMode, TimedMode, SniperMode, ChallengeMode
+from engine import GameSession, MAX_ERRORS, MAX_RANDOMS, REASON_STUCK, REFILL_LIMIT, REFILL_FULL
+from render import make_renderer
+from scheduler import TickScheduler
+from sprites import get_sprites, load_image, tile_for_board
+from startup import PROFILE, lazy_import
+
+# Okna dialogowe i klasy trybów ładowane dopiero przy pierwszym użyciu
+messagebox = lazy_import("tkinter.messagebox")
+filedialog = lazy_import("tkinter.filedialog")
+game_modes = lazy_import("game_modes")
+journal = lazy_import("journal")
+hints = lazy_import("hints")
+scores = lazy_import("scores")
+history = lazy_import("history")
+
+SAVE_FILETYPES = [("SumUp", "*.sumup"), ("CSV", "*.csv")]
+LOAD_FILETYPES = SAVE_FILETYPES + [("Dziennik ruchów", "*.sumupj")]
+AUTOSAVE_PATH = "autosave.sumupj"
+SCORES_PATH = "scores.db"
 
 
 class GameGUI:
-    def __init__(self, root):
+    def __init__(self, root, size=None):
         self.root = root
         self.root.title("SumUp")
         self.root.geometry("500x600")
 
-        self.board = GameBoard()
-        self.images = self.load_images()
-        self.buttons = []
+        self.board = GameBoard(size)
+        self.session = None
+        self.journal = None
+        self.hint_service = None
+        self.score_writer = None
+        self.tile = tile_for_board(self.board.size)
+        self.images = self.load_images(self.tile)
         self.selected = []
+        self._label_text = {}
+        self._label_visible = {}
 
         self.mode = None
-        self.start_time = None
         self.running = False
         self.paused = False
-        self.timer_id = None
-        self.MAX_ERRORS = 5
+        # Jeden zegar gry: etykieta czasu i terminy trybów, pauza w jednym miejscu
+        self.scheduler = TickScheduler(after=self.root.after, after_cancel=self.root.after_cancel)
+        self.MAX_ERRORS = MAX_ERRORS
 
         self.create_widgets()
         self.update_gui()
 
     def create_widgets(self):
+        lap = PROFILE.laps("widget")
         # Logo
-        logo_img = Image.open("assets/4343.png").resize((250, 80), Image.Resampling.LANCZOS)
-        self.logo = ImageTk.PhotoImage(logo_img)
+        self.logo = load_image("assets/4343.png", (250, 80), "lanczos")
         tk.Label(self.root, image=self.logo).pack(pady=10)
+        lap("logo")
 
         # Top Buttons
         top_frame = tk.Frame(self.root)
@@ -57,20 +79,15 @@ class GameGUI:
 
         for text, value in modes:
             tk.Radiobutton(mode_frame, text=text, variable=self.mode_var, value=value).pack(side=tk.LEFT, padx=2)
-
+        lap("controls")
 
         # Game Board Buttons
         board_frame = tk.Frame(self.root)
         board_frame.pack()
 
-        for i in range(GameBoard.SIZE):
-            row = []
-            for j in range(GameBoard.SIZE):
-                btn = tk.Button(board_frame, image=self.images[None],
-                                command=lambda r=i, c=j: self.block_clicked(r, c))
-                btn.grid(row=i, column=j, padx=1, pady=1)
-                row.append(btn)
-            self.buttons.append(row)
+        self.renderer = make_renderer(board_frame, self.images, self.block_clicked, self.board.size, self.tile)
+        self.renderer.attach(self.board)
+        lap("board")
 
         # Bottom Buttons
         bottom_frame = tk.Frame(self.root)
@@ -79,9 +96,19 @@ class GameGUI:
         row1 = tk.Frame(bottom_frame)
         row1.pack()
         tk.Button(row1, text="Losuj liczby", command=self.randomize_numbers).pack(side=tk.LEFT, padx=5)
-        tk.Button(row1, text="Zasady gry", command=self.show_rules).pack(side=tk.LEFT, padx=5)
-        tk.Button(row1, text="Zapisz planszę", command=self.save_board).pack(side=tk.LEFT, padx=5)
-        tk.Button(row1, text="Wczytaj planszę", command=self.load_board).pack(side=tk.LEFT, padx=5)
+        tk.Button(row1, text="Podpowiedź", command=self.show_hint).pack(side=tk.LEFT, padx=5)
+        tk.Button(row1, text="Cofnij", command=self.undo_move).pack(side=tk.LEFT, padx=5)
+        tk.Button(row1, text="Ponów", command=self.redo_move).pack(side=tk.LEFT, padx=5)
+
+        row_files = tk.Frame(bottom_frame)
+        row_files.pack(pady=(5, 0))
+        tk.Button(row_files, text="Zasady gry", command=self.show_rules).pack(side=tk.LEFT, padx=5)
+        tk.Button(row_files, text="Wyniki", command=self.show_scores).pack(side=tk.LEFT, padx=5)
+        tk.Button(row_files, text="Zapisz planszę", command=self.save_board).pack(side=tk.LEFT, padx=5)
+        tk.Button(row_files, text="Wczytaj planszę", command=self.load_board).pack(side=tk.LEFT, padx=5)
+
+        self.root.bind("<Control-z>", lambda event: self.undo_move())
+        self.root.bind("<Control-y>", lambda event: self.redo_move())
 
         # Status Labels
         row2 = tk.Frame(bottom_frame)
@@ -97,6 +124,8 @@ class GameGUI:
         self.random_count_label.pack(side=tk.LEFT, padx=10)
         self.move_label = tk.Label(row2, text="Ruchy: 30/30")
         self.move_label.pack_forget()  # domyślnie ukryta
+        self._label_visible = {self.error_label: True, self.move_label: False}
+        lap("status")
 
     def start_game(self):
         if self.running:
@@ -106,42 +135,57 @@ class GameGUI:
         self.running = True
         self.paused = False
 
-        self.board = GameBoard()
         mode_type = self.mode_var.get()
-        mode_map = {
-            "standard": StandardMode,
-            "timed": TimedMode,
-            "sniper": SniperMode,
-            "challenge": ChallengeMode
-        }
-        self.mode = mode_map[mode_type](self)
+        self.session = GameSession(mode_type, board=GameBoard(self.board.size))
+        self.board = self.session.board
+        self.renderer.attach(self.board)
+        self.scheduler.stop()
+        self.mode = game_modes.MODES[mode_type](self)
         self.mode.start()
 
         self.selected.clear()
-        self.start_time = time.time()
+        self.start_clock()
 
         self.init_board_with_random_values()
+        self.start_journal()
+        self.session.history = history.History()
 
         self.update_labels()
 
         self.animate_start(0)
 
-        self.board.mode_name = mode_type
-
     def init_board_with_random_values(self):
-        for i in range(3):
-            for j in range(GameBoard.SIZE):
-                self.board.board[i][j].value = random.randint(1, 9)
+        self.session.start()
+
+    def start_journal(self):
+        # Każda rozgrywka zapisywana na bieżąco do AUTOSAVE_PATH
+        self.close_journal()
+        try:
+            self.journal = journal.JournalWriter(AUTOSAVE_PATH)
+        except OSError:
+            self.journal = None
+            return
+        self.journal.record_start(self.board)
+        self.session.journal = self.journal
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def journal_event(self, code):
+        if self.journal is not None:
+            self.journal.record_event(code, self.board.elapsed_time)
 
     def animate_start(self, step):
         if step < 6:
             for i in range(3):
-                for j in range(GameBoard.SIZE):
-                    self.buttons[i][j].config(bg="yellow")
+                for j in range(self.board.size):
+                    self.renderer.highlight(i, j, "yellow")
+            self.renderer.flush()
             self.root.after(50, lambda: self.animate_start(step + 1))
         else:
             self.update_gui()
-            self.update_timer()
 
     def pause_game(self):
         if not self.running:
@@ -150,12 +194,13 @@ class GameGUI:
 
         if not self.paused:
             self.paused = True
-            self.board.elapsed_time += time.time() - self.start_time
-            self.root.after_cancel(self.timer_id)
+            self.scheduler.pause()
+            self.sync_elapsed()
+            self.journal_event(journal.EVENT_PAUSE)
             if messagebox.askokcancel("Pauza", "Gra wstrzymana. Kliknij OK aby wznowić."):
                 self.paused = False
-                self.start_time = time.time()
-                self.update_timer()
+                self.journal_event(journal.EVENT_RESUME)
+                self.scheduler.resume()
 
     def stop_game(self, reason=None):
         if not self.running:
@@ -164,10 +209,16 @@ class GameGUI:
 
         self.running = False
         self.paused = False
-        if self.timer_id:
-            self.root.after_cancel(self.timer_id)
-
-        total_time = int(self.board.elapsed_time + (time.time() - self.start_time))
+        self.scheduler.stop()
+        self.sync_elapsed()
+        if self.hint_service is not None:
+            self.hint_service.cancel()
+
+        total_time = int(self.board.elapsed_time)
+        if self.session is not None:
+            self.session.finish(reason)
+            self.record_score()
+        self.close_journal()
         msg = f"{reason + '\n\n' if reason else ''}Czas: {time.strftime('%H:%M:%S', time.gmtime(total_time))}\nPunkty: {self.board.score}"
         messagebox.showinfo("Koniec gry", msg)
 
@@ -180,96 +231,179 @@ class GameGUI:
             return
 
         self.selected.append(pos)
-        self.buttons[row][col].config(bg="lightblue")
+        self.renderer.highlight(row, col, "lightblue")
+        self.renderer.flush()
 
         if len(self.selected) == 2:
             self.handle_match()
             self.selected.clear()
             self.update_gui()
 
-            if self.board.is_board_empty():
-                self.stop_game("Gratulacje! Wyczyściłeś całą planszę!")
+            if self.session.over:
+                self.stop_game(self.session.reason)
 
     def handle_match(self):
         pos1, pos2 = self.selected
-        if self.board.is_match(pos1, pos2):
-            val1, val2 = self.board.get_value(pos1.row, pos1.col), self.board.get_value(pos2.row, pos2.col)
-            self.board.clear_positions(pos1, pos2)
-            self.board.score += 5 if val1 == val2 else 10
-            if hasattr(self.mode, 'on_match'):
-                self.mode.on_match()
+        self.sync_elapsed()
+        result = self.session.play(pos1, pos2)
+        if result.matched:
+            self.mode.on_match()
         else:
-            self.board.errors += 1
-            self.error_label.config(text=f"Błędy: {self.board.errors}/{self.MAX_ERRORS}")
-            if self.board.errors >= self.MAX_ERRORS:
-                self.stop_game("Przekroczono limit błędów.")
-            else:
+            self.set_label(self.error_label, f"Błędy: {self.board.errors}/{self.MAX_ERRORS}")
+            if self.board.errors < self.MAX_ERRORS:
+                val1, val2 = result.values
                 messagebox.showwarning("Błąd!",
-                    f"Niepoprawne dopasowanie:\n({self.board.get_value(pos1.row, pos1.col)}) i ({self.board.get_value(pos2.row, pos2.col)}) "
+                    f"Niepoprawne dopasowanie:\n({val1}) i ({val2}) "
                     "nie spełniają warunków. Muszą być równe lub sumować się do 10 i być połączalne.")
-                self.mode.on_match_failed()
+            self.mode.on_match_failed()
 
     def update_gui(self):
-        for i in range(GameBoard.SIZE):
-            for j in range(GameBoard.SIZE):
-                val = self.board.get_value(i, j)
-                self.buttons[i][j].config(image=self.images.get(val, self.images[None]), bg="SystemButtonFace")
+        self.renderer.clear_highlights()
+        self.renderer.flush()
         self.update_labels()
+        if self.running:
+            # Podpowiedź liczy się w tle, zanim gracz o nią poprosi
+            self.get_hint_service().prefetch(self.board)
 
+    def get_hint_service(self):
+        if self.hint_service is None:
+            self.hint_service = hints.HintService(self.root)
+        return self.hint_service
+
+    def show_hint(self):
+        if not self.running:
+            messagebox.showinfo("Błąd", "Gra nie została rozpoczęta.")
+            return
+        # Aktualny czas gry - w trybie timed wchodzi do klucza cache podpowiedzi
+        self.sync_elapsed()
+        self.get_hint_service().request(self.board, self.show_hint_result)
+
+    def show_hint_result(self, hint):
+        if not self.running:
+            return
+        if hint.kind == hints.HINT_RANDOMIZE:
+            messagebox.showinfo("Podpowiedź", "Najlepiej teraz dolosować liczby.")
+            return
+        if hint.pair is None:
+            messagebox.showinfo("Podpowiedź", "Brak możliwych ruchów. Spróbuj dolosować liczby.")
+            return
+        for pos in hint.pair:
+            if pos not in self.selected:
+                self.renderer.highlight(pos.row, pos.col, "lightgreen")
+        self.renderer.flush()
+
+    def set_label(self, label, text):
+        # Konfiguracja tylko przy zmianie tekstu
+        if self._label_text.get(label) != text:
+            self._label_text[label] = text
+            label.config(text=text)
+
+    def show_label(self, label, visible):
+        # Pakowanie tylko przy zmianie widoczności
+        if self._label_visible.get(label) != visible:
+            self._label_visible[label] = visible
+            if visible:
+                label.pack(side=tk.LEFT, padx=10)
+            else:
+                label.pack_forget()
 
     def update_labels(self):
-        self.score_label.config(text=f"Punkty: {self.board.score}")
-        self.error_label.config(text=f"Błędy: {self.board.errors}/{self.MAX_ERRORS}")
-        self.random_count_label.config(text=f"Dolosowania: {self.board.random_count}/6")
-
-        if not isinstance(self.mode, TimedMode):
-            total_time = int(self.board.elapsed_time + (
-                        time.time() - self.start_time)) if self.running and not self.paused else self.board.elapsed_time
-            self.time_label.config(text=f"Czas: {time.strftime('%H:%M:%S', time.gmtime(total_time))}")
-
-        if isinstance(self.mode, ChallengeMode):  # jeśli tryb punktowy
-            self.move_label.config(text=f"Ruchy: {self.mode.moves_left}/30")
-            self.move_label.pack(side=tk.LEFT, padx=10)
+        self.set_label(self.score_label, f"Punkty: {self.board.score}")
+        self.set_label(self.random_count_label, f"Dolosowania: {self.board.random_count}/{MAX_RANDOMS}")
+
+        if getattr(self.mode, "shows_clock", True):
+            self.show_clock()
+
+        if getattr(self.mode, "shows_moves", False):  # jeśli tryb punktowy
+            self.set_label(self.move_label, f"Ruchy: {self.mode.moves_left}/{self.session.rules.max_moves}")
+            self.show_label(self.move_label, True)
         else:
-            self.move_label.pack_forget()
+            self.show_label(self.move_label, False)
 
-        if isinstance(self.mode, SniperMode):
-            self.error_label.pack_forget()
+        if getattr(self.mode, "shows_errors", True):
+            self.set_label(self.error_label, f"Błędy: {self.board.errors}/{self.MAX_ERRORS}")
+            self.show_label(self.error_label, True)
         else:
-            self.error_label.config(text=f"Błędy: {self.board.errors}/{self.MAX_ERRORS}")
-            self.error_label.pack(side=tk.LEFT, padx=10)
+            self.show_label(self.error_label, False)
 
-    def update_timer(self):
-        if self.running and not self.paused:
-            self.update_labels()
-            self.timer_id = self.root.after(1000, self.update_timer)
-            self.mode.on_tick()
+    def start_clock(self):
+        # Subskrypcje trybu dodane wcześniej w mode.start(); zegar liczy od zapisanego czasu gry
+        if getattr(self.mode, "shows_clock", True):
+            self.scheduler.every(1.0, self.show_clock)
+        self.scheduler.start(self.board.elapsed_time)
+
+    def show_clock(self, elapsed=None):
+        if elapsed is None:
+            elapsed = self.scheduler.elapsed()
+        self.set_label(self.time_label, f"Czas: {time.strftime('%H:%M:%S', time.gmtime(int(elapsed)))}")
 
+    def sync_elapsed(self):
+        self.board.elapsed_time = self.scheduler.elapsed()
 
     def randomize_numbers(self):
         if not self.running:
             messagebox.showinfo("Błąd", "Gra nie została rozpoczęta.")
             return
 
-        if self.board.random_count >= 6:
+        status = self.session.randomize()
+        if status == REFILL_LIMIT:
             messagebox.showinfo("Limit", "Osiągnięto maksymalną liczbę losowań.")
             return
 
-        empty_rows = [(i, sum(1 for cell in row if cell.is_empty())) for i, row in enumerate(self.board.board)]
-        empty_rows.sort(key=lambda x: -x[1])
-        selected = [i for i, count in empty_rows[:2] if count > 0]
-
-        if not selected:
+        if status == REFILL_FULL:
             messagebox.showinfo("Brak miejsc", "Brak pustych miejsc do wstawienia liczb.")
             return
 
-        existing_values = [block.value for row in self.board.board for block in row if block.value]
-        for i in selected:
-            for j in range(GameBoard.SIZE):
-                if self.board.board[i][j].is_empty():
-                    self.board.board[i][j].value = random.choice(existing_values)
-        self.board.random_count += 1
         self.update_gui()
+        if self.session.over:
+            self.stop_game(self.session.reason)
+
+    def record_score(self):
+        # Zapis w tle (scores.ScoreWriter), wątek Tk tylko dodaje do kolejki
+        if self.score_writer is None:
+            self.score_writer = scores.ScoreWriter(SCORES_PATH)
+        self.score_writer.submit(scores.summary_row(self.session.summary()))
+
+    def show_scores(self):
+        mode = self.mode_var.get()
+        if self.score_writer is not None:
+            # Najwyżej FLUSH_TIMEOUT - wyniki bez ostatniej gry zamiast zawieszonego okna
+            self.score_writer.flush(scores.FLUSH_TIMEOUT)
+        try:
+            store = scores.ScoreStore(SCORES_PATH)
+            try:
+                rows = store.top(mode, 10, scores.SOURCE_GUI)
+            finally:
+                store.close()
+        except Exception as e:
+            messagebox.showerror("Błąd", f"Nie udało się odczytać wyników:\n{e}")
+            return
+        if not rows:
+            messagebox.showinfo("Wyniki", "Brak zapisanych gier w tym trybie.")
+            return
+        lines = [
+            f"{place}. {row['score']} pkt, {time.strftime('%H:%M:%S', time.gmtime(int(row['elapsed_time'])))}, "
+            f"{time.strftime('%Y-%m-%d', time.localtime(row['finished_at']))}"
+            for place, row in enumerate(rows, 1)
+        ]
+        messagebox.showinfo("Wyniki", "Najlepsze wyniki:\n\n" + "\n".join(lines))
+
+    def undo_move(self):
+        # Cofa ostatni ruch albo dolosowanie (pola, punkty, błędy, licznik ruchów)
+        if not self.running or self.paused:
+            return
+        if self.session.undo():
+            self.selected.clear()
+            self.update_gui()
+
+    def redo_move(self):
+        if not self.running or self.paused:
+            return
+        if self.session.redo():
+            self.selected.clear()
+            self.update_gui()
+            if self.session.over:
+                self.stop_game(self.session.reason)
 
     def show_rules(self):
         if self.running and not self.paused:
@@ -294,50 +428,58 @@ class GameGUI:
         messagebox.showinfo("Zasady gry", rules)
 
     def save_board(self):
-        if self.running and not self.paused:
-            self.board.elapsed_time += time.time() - self.start_time
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
+        if self.running:
+            self.sync_elapsed()
+        file_path = filedialog.asksaveasfilename(defaultextension=".sumup", filetypes=SAVE_FILETYPES)
         if file_path:
-            self.board.save_to_file(file_path)
+            try:
+                self.board.save_to_file(file_path)
+            except OSError as e:
+                messagebox.showerror("Błąd", f"Nie udało się zapisać planszy:\n{e}")
+                return
             messagebox.showinfo("Zapisano", f"Plansza zapisana:\n{file_path}")
 
     def load_board(self):
-        file_path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
-        if not file_path or not file_path.endswith('.csv'):
-            messagebox.showerror("Błąd", "Nie wybrano poprawnego pliku CSV.")
+        file_path = filedialog.askopenfilename(filetypes=LOAD_FILETYPES)
+        if not file_path or not file_path.endswith(('.sumup', '.csv', '.sumupj')):
+            messagebox.showerror("Błąd", "Nie wybrano poprawnego pliku planszy (.sumup, .csv lub .sumupj).")
             return
 
         try:
-            self.board.load_from_file(file_path)
-
-            mode_map = {
-                "standard": StandardMode,
-                "timed": TimedMode,
-                "sniper": SniperMode,
-                "challenge": ChallengeMode
-            }
-            mode_key = self.board.mode_name
-            self.mode_var.set(mode_key)
-
-            if mode_key == "challenge" and hasattr(self.board, "saved_moves_left"):
-                self.mode = ChallengeMode(self, moves_left=self.board.saved_moves_left)
+            if file_path.endswith('.sumupj'):
+                # Stan końcowy odtworzony z dziennika ruchów
+                self.session = journal.restore(file_path)
+                self.session.over = False
+                self.session.reason = None
+                self.board = self.session.board
+                mode_key = self.board.mode_name
             else:
-                self.mode = mode_map[mode_key](self)
+                # Wczytanie do nowej planszy - błąd w pliku nie rusza trwającej gry
+                board = GameBoard(self.board.size)
+                board.load_from_file(file_path)
+                self.board = board
+                mode_key = self.board.mode_name
+                self.session = GameSession(mode_key, board=self.board)
+            self.mode_var.set(mode_key)
+            self.start_journal()
+            self.session.history = history.History()
+            self.renderer.attach(self.board)
+            self.scheduler.stop()
+            self.mode = game_modes.MODES[mode_key](self)
 
             self.mode.start()
-            self.start_time = time.time()
+            self.start_clock()
             self.running = True
             self.paused = False
             self.update_gui()
-            self.update_timer()
+            # Zapisana pozycja może być już martwa - koniec gry jak po ruchu
+            if self.session.is_stuck():
+                self.session.finish(REASON_STUCK)
+            if self.session.over:
+                self.stop_game(self.session.reason)
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie udało się wczytać planszy:\n{e}")
 
-    def load_images(self):
-        images = {}
-        for i in range(1, 10):
-            img = Image.open(f"assets/img/{i}.png").resize((50, 50))
-            images[i] = ImageTk.PhotoImage(img)
-        img_empty = Image.open("assets/img/empty.png").resize((50, 50))
-        images[None] = ImageTk.PhotoImage(img_empty)
-        return images
+    def load_images(self, tile=50):
+        # Przeskalowane obrazki z cache (assets/.cache), ładowane leniwie
+        return get_sprites(tile)
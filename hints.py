@@ -0,0 +1,177 @@
+# hints.py
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import RULES, GameSession, score_for
+from mcts import MCTS, RANDOMIZE
+from solver import Solver
+
+HINT_NODES = 50_000
+HINT_TIME = 0.5  # budżet MCTS w trybach z limitem ruchów lub czasu
+TIME_BUCKET = 2.0  # w trybie timed plan z cache ważny tylko w tym samym przedziale pozostałego czasu
+POLL_MS = 30
+CACHE_SIZE = 64
+
+log = logging.getLogger(__name__)
+
+HINT_SOLUTION = "solution"  # pierwszy ruch pełnego rozwiązania
+HINT_MOVE = "move"          # najlepiej punktowana legalna para
+HINT_PLAN = "plan"          # ruch wybrany przez MCTS (limit ruchów lub czasu)
+HINT_RANDOMIZE = "randomize"  # MCTS zaleca dolosowanie
+HINT_NONE = "none"          # brak legalnych ruchów
+
+
+class Hint:
+    __slots__ = ("pair", "kind", "result")
+
+    def __init__(self, pair, kind, result=None):
+        self.pair = pair
+        self.kind = kind
+        self.result = result
+
+    def __repr__(self):
+        return f"Hint({self.pair!r}, {self.kind!r})"
+
+
+def best_pair(board):
+    cells = board.cells
+    best = None
+    for a, b in sorted(board.legal_pairs()):
+        if best is None or score_for(cells[a], cells[b]) > score_for(cells[best[0]], cells[best[1]]):
+            best = (a, b)
+    return best
+
+
+def plan_hint(board, cancel=None, time_budget=HINT_TIME):
+    # Przy limicie ruchów lub czasu pełne rozwiązanie nie musi być najlepsze -
+    # MCTS maksymalizuje oczekiwany wynik i może zalecić dolosowanie
+    session = GameSession(board.mode_name, board=board)
+    result = MCTS(time_budget=time_budget).search(session, cancel)
+    action = result.positions(board)
+    if action is None:
+        return Hint(None, HINT_NONE, result)
+    if action == RANDOMIZE:
+        return Hint(None, HINT_RANDOMIZE, result)
+    return Hint(action, HINT_PLAN, result)
+
+
+def compute_hint(board, cancel=None, solver=None):
+    # Najpierw tani przypadek bez ruchów, potem solver z budżetem węzłów;
+    # bez rozwiązania w budżecie - para zachłanna
+    rules = RULES.get(getattr(board, "mode_name", None))
+    if rules is not None and (rules.max_moves is not None or rules.time_limit is not None):
+        return plan_hint(board, cancel)
+    pair = best_pair(board)
+    if pair is None:
+        return Hint(None, HINT_NONE)
+    solver = solver or Solver(max_nodes=HINT_NODES, table_size=HINT_NODES)
+    result = solver.solve(board, cancel=cancel)
+    if result.status == "solved" and result.moves:
+        return Hint(result.moves[0], HINT_SOLUTION, result)
+    return Hint((board.position(pair[0]), board.position(pair[1])), HINT_MOVE, result)
+
+
+def board_key(board):
+    # Dolosowania, pozostałe ruchy i pozostały czas zmieniają najlepszy ruch w planie MCTS
+    rules = RULES.get(getattr(board, "mode_name", None))
+    time_bucket = None
+    if rules is not None and rules.time_limit is not None:
+        time_bucket = int(max(0.0, rules.time_limit - board.elapsed_time) // TIME_BUCKET)
+    return board.size, bytes(board.cells), board.random_count, getattr(board, "moves_left", None), time_bucket
+
+
+# === Hint Service ===
+class HintService:
+    # Podpowiedź liczona w wątku roboczym zaraz po zmianie planszy. Wątek Tk
+    # nigdy nie czeka: wynik odbierany przez root.after co POLL_MS, a zmiana
+    # planszy anuluje nieaktualne obliczenie. Wyniki pamiętane per stan planszy.
+
+    def __init__(self, root, max_nodes=HINT_NODES, cache_size=CACHE_SIZE):
+        self.root = root
+        self.cache_size = cache_size
+        self._solver = Solver(max_nodes=max_nodes, table_size=max_nodes)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hint")
+        self._cache = OrderedDict()
+        self._pending = None  # (klucz, future, Event anulowania, kopia planszy)
+        self._waiters = []
+        self._poll_id = None
+
+    def cached(self, board):
+        key = board_key(board)
+        hint = self._cache.get(key)
+        if hint is not None:
+            self._cache.move_to_end(key)
+        return hint
+
+    def prefetch(self, board):
+        key = board_key(board)
+        if key in self._cache:
+            return
+        if self._pending is not None and self._pending[0] == key:
+            return
+        self.cancel()
+        cancel = threading.Event()
+        # Wątek dostaje kopię - plansza GUI może się zmieniać w trakcie;
+        # druga kopia służy do pary zapasowej, gdyby obliczenie się wysypało
+        future = self._executor.submit(compute_hint, board.copy(), cancel, self._solver)
+        self._pending = (key, future, cancel, board.copy())
+        self._schedule_poll()
+
+    def request(self, board, callback):
+        # callback(hint) od razu z cache albo później z wątku Tk
+        hint = self.cached(board)
+        if hint is not None:
+            callback(hint)
+            return True
+        self.prefetch(board)
+        self._waiters.append(callback)
+        return False
+
+    def cancel(self):
+        if self._pending is not None:
+            _, future, cancel, _ = self._pending
+            cancel.set()
+            future.cancel()
+            self._pending = None
+        self._waiters.clear()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        if self._pending is None:
+            return
+        key, future, _, board = self._pending
+        if not future.done():
+            self._schedule_poll()
+            return
+        self._pending = None
+        waiters, self._waiters = self._waiters, []
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            # Błąd solvera/MCTS: zapis do logu i para zachłanna, bez zapamiętywania
+            log.error("hint computation failed", exc_info=error)
+            pair = best_pair(board)
+            hint = Hint((board.position(pair[0]), board.position(pair[1])), HINT_MOVE) if pair else Hint(None, HINT_NONE)
+            for callback in waiters:
+                callback(hint)
+            return
+        hint = future.result()
+        self._cache[key] = hint
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        for callback in waiters:
+            callback(hint)
@@ -0,0 +1,99 @@
+# history.py
+import struct
+from array import array
+
+from engine import REASONS
+
+# Nagłówek wpisu: zmiana wyniku, flagi, powód końca gry, zmiany błędów,
+# dolosowań i pozostałych ruchów, liczba zmienionych pól
+HEADER = struct.Struct("<iBBbbbH")
+# Zmienione pole: indeks, wartość przed, wartość po
+CELL = struct.Struct("<Ibb")
+
+FLAG_MOVE = 1   # wpis liczy się jako ruch (moves_used)
+FLAG_ENDED = 2  # akcja zakończyła rozgrywkę
+
+NO_REASON = 255
+
+
+# === History ===
+class History:
+    # Cofanie i ponawianie na zapisach różnic: jeden bufor bajtów i tablica
+    # końców wpisów. Ruch to kilkanaście bajtów; krok kosztuje O(zmienione pola).
+
+    def __init__(self):
+        self._data = bytearray()
+        self._ends = array("I")
+        self._pos = 0  # liczba wpisów aktualnie zastosowanych
+
+    def __len__(self):
+        return len(self._ends)
+
+    @property
+    def nbytes(self):
+        return len(self._data) + self._ends.itemsize * len(self._ends)
+
+    def can_undo(self):
+        return self._pos > 0
+
+    def can_redo(self):
+        return self._pos < len(self._ends)
+
+    def record(self, cells, score=0, errors=0, random_count=0, moves_left=0, move=False, ended=None):
+        # cells: lista (indeks, przed, po); nowa akcja po cofnięciu usuwa gałąź ponowień
+        if self._pos < len(self._ends):
+            del self._data[self._ends[self._pos - 1] if self._pos else 0:]
+            del self._ends[self._pos:]
+        flags = (FLAG_MOVE if move else 0) | (FLAG_ENDED if ended is not None else 0)
+        reason = REASONS.index(ended) if ended in REASONS else NO_REASON
+        self._data += HEADER.pack(score, flags, reason, errors, random_count, moves_left, len(cells))
+        for cell in cells:
+            self._data += CELL.pack(*cell)
+        self._ends.append(len(self._data))
+        self._pos += 1
+
+    def _entry(self, i):
+        start = self._ends[i - 1] if i else 0
+        header = HEADER.unpack_from(self._data, start)
+        return header, range(start + HEADER.size, self._ends[i], CELL.size)
+
+    def undo(self, session):
+        if not self.can_undo():
+            return False
+        self._pos -= 1
+        (score, flags, _, errors, random_count, moves_left, _), offsets = self._entry(self._pos)
+        board = session.board
+        for offset in reversed(offsets):
+            idx, old, _ = CELL.unpack_from(self._data, offset)
+            board.set_index(idx, old)
+        self._shift(session, -1, score, flags, errors, random_count, moves_left)
+        if flags & FLAG_ENDED:
+            session.over = False
+            session.reason = None
+        return True
+
+    def redo(self, session):
+        if not self.can_redo():
+            return False
+        (score, flags, reason, errors, random_count, moves_left, _), offsets = self._entry(self._pos)
+        self._pos += 1
+        board = session.board
+        for offset in offsets:
+            idx, _, new = CELL.unpack_from(self._data, offset)
+            board.set_index(idx, new)
+        self._shift(session, 1, score, flags, errors, random_count, moves_left)
+        if flags & FLAG_ENDED:
+            session.over = True
+            session.reason = REASONS[reason] if reason < len(REASONS) else None
+        return True
+
+    @staticmethod
+    def _shift(session, sign, score, flags, errors, random_count, moves_left):
+        board = session.board
+        board.score += sign * score
+        board.errors += sign * errors
+        board.random_count += sign * random_count
+        if moves_left:
+            board.moves_left += sign * moves_left
+        if flags & FLAG_MOVE:
+            session.moves_used += sign
@@ -0,0 +1,249 @@
+# journal.py
+import bisect
+import os
+import struct
+import zlib
+
+from engine import REASONS, RULES, GameSession
+from savefile import pack_board, unpack_board
+
+JOURNAL_EXTENSION = ".sumupj"
+JOURNAL_MAGIC = b"SUMJ"
+VERSION = 1
+SNAPSHOT_EVERY = 25
+
+REC_MATCH = 1
+REC_REFILL = 2
+REC_EVENT = 3
+REC_SNAPSHOT = 4
+
+EVENT_START = 1
+EVENT_PAUSE = 2
+EVENT_RESUME = 3
+EVENT_TIME = 4
+EVENT_END = 5
+EVENT_UNDO = 6
+EVENT_REDO = 7
+
+NO_REASON = 255
+
+FILE_HEADER = struct.Struct("<4sH")
+# Nagłówek rekordu: typ, długość danych, CRC32 danych (wykrywa urwany zapis)
+RECORD = struct.Struct("<BII")
+MATCH = struct.Struct("<IIB")
+CELL = struct.Struct("<Ib")
+EVENT = struct.Struct("<Bd")
+SNAPSHOT = struct.Struct("<I")
+
+
+class JournalError(ValueError):
+    pass
+
+
+def reason_code(reason):
+    return REASONS.index(reason) if reason in REASONS else NO_REASON
+
+
+# === Journal Writer ===
+class JournalWriter:
+    # Dziennik tylko do dopisywania: jeden krótki rekord na zdarzenie,
+    # pełny obraz planszy co snapshot_every ruchów
+
+    def __init__(self, filename, snapshot_every=SNAPSHOT_EVERY, sync=False):
+        self.filename = filename
+        self.snapshot_every = snapshot_every
+        self.sync = sync
+        self.moves = 0
+        self._fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        os.write(self._fd, FILE_HEADER.pack(JOURNAL_MAGIC, VERSION))
+
+    def _append(self, rtype, payload):
+        os.write(self._fd, RECORD.pack(rtype, len(payload), zlib.crc32(payload)) + payload)
+        if self.sync:
+            os.fsync(self._fd)
+
+    def record_match(self, board, pos1, pos2, matched):
+        self._append(REC_MATCH, MATCH.pack(board.index(pos1.row, pos1.col),
+                                           board.index(pos2.row, pos2.col), matched))
+        self.moves += 1
+        if self.snapshot_every and self.moves % self.snapshot_every == 0:
+            self.snapshot(board)
+
+    def record_refill(self, changes):
+        self._append(REC_REFILL, b"".join(CELL.pack(idx, value) for idx, value in changes))
+
+    def record_event(self, code, value=0.0):
+        self._append(REC_EVENT, EVENT.pack(code, value))
+
+    def record_start(self, board):
+        # Początek zapisu: pełny obraz planszy i czas gry, od którego liczy się dziennik
+        self.snapshot(board)
+        self.record_event(EVENT_START, board.elapsed_time)
+
+    def record_undo(self, board, moves_used):
+        # Po cofnięciu pełny obraz planszy: odtwarzanie nie potrzebuje historii;
+        # wartość zdarzenia to liczba ruchów sesji po cofnięciu
+        self.record_event(EVENT_UNDO, moves_used)
+        self.snapshot(board)
+
+    def record_redo(self, board, moves_used):
+        self.record_event(EVENT_REDO, moves_used)
+        self.snapshot(board)
+
+    def record_end(self, board, reason):
+        self.record_event(EVENT_TIME, board.elapsed_time)
+        self.record_event(EVENT_END, reason_code(reason))
+
+    def snapshot(self, board):
+        self._append(REC_SNAPSHOT, SNAPSHOT.pack(self.moves) + pack_board(board))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# === Journal Reader ===
+class JournalReader:
+    # Indeksuje rekordy jednym przebiegiem; stan po N ruchach odtwarzany
+    # od najbliższego wcześniejszego snapshotu
+
+    def __init__(self, filename):
+        with open(filename, "rb") as f:
+            self._data = data = f.read()
+        if len(data) < FILE_HEADER.size:
+            raise JournalError("Journal file is empty")
+        magic, version = FILE_HEADER.unpack_from(data, 0)
+        if magic != JOURNAL_MAGIC:
+            raise JournalError("Not a SumUp journal")
+        if version > VERSION:
+            raise JournalError(f"Unsupported journal version {version}")
+
+        self.records = []      # (typ, offset danych, długość)
+        self.snapshots = []    # (numer ruchu, indeks rekordu, moves_used sesji)
+        self.truncated = False
+        self.moves = 0
+        used = 0  # ruchy sesji: rekordy ruchów minus cofnięte
+        offset = FILE_HEADER.size
+        while offset < len(data):
+            if offset + RECORD.size > len(data):
+                self.truncated = True
+                break
+            rtype, length, crc = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            payload = data[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                # Urwany ostatni zapis (np. po awarii) - reszta jest ignorowana
+                self.truncated = True
+                break
+            if rtype == REC_MATCH:
+                self.moves += 1
+                used += 1
+            elif rtype == REC_EVENT:
+                code, value = EVENT.unpack_from(data, start)
+                if code in (EVENT_UNDO, EVENT_REDO):
+                    used = int(value)
+            elif rtype == REC_SNAPSHOT:
+                self.snapshots.append((SNAPSHOT.unpack_from(data, start)[0], len(self.records), used))
+            self.records.append((rtype, start, length))
+            offset = start + length
+        if not self.snapshots:
+            raise JournalError("Journal has no snapshot to start from")
+
+    def _snapshot_before(self, move):
+        i = bisect.bisect_right(self.snapshots, (move, len(self.records))) - 1
+        return self.snapshots[max(i, 0)]
+
+    def _session_from(self, record_index):
+        _, start, _ = self.records[record_index]
+        board = unpack_board(self._data, start + SNAPSHOT.size)
+        return GameSession(board.mode_name, board=board, rules=RULES.get(board.mode_name))
+
+    def replay(self, move=None, on_match=None):
+        # Sesja w stanie po `move` ruchach (domyślnie po wszystkich)
+        move = self.moves if move is None else max(0, min(move, self.moves))
+        done, first, used = self._snapshot_before(move)
+        session = self._session_from(first)
+        session.moves_used = used
+        board = session.board
+        data = self._data
+
+        for rtype, start, length in self.records[first + 1:]:
+            if rtype == REC_MATCH:
+                if done >= move:
+                    break
+                idx1, idx2, matched = MATCH.unpack_from(data, start)
+                result = session.play(board.position(idx1), board.position(idx2))
+                if on_match is not None:
+                    on_match(done, bool(matched), result)
+                done += 1
+            elif rtype == REC_REFILL:
+                for offset in range(start, start + length, CELL.size):
+                    idx, value = CELL.unpack_from(data, offset)
+                    board.set_index(idx, value)
+                board.random_count += 1
+            elif rtype == REC_EVENT:
+                code, value = EVENT.unpack_from(data, start)
+                if code in (EVENT_START, EVENT_TIME, EVENT_PAUSE, EVENT_RESUME):
+                    board.elapsed_time = value
+                elif code == EVENT_END:
+                    session.finish(REASONS[int(value)] if int(value) < len(REASONS) else None)
+                elif code in (EVENT_UNDO, EVENT_REDO):
+                    session.moves_used = int(value)
+                    if code == EVENT_UNDO:
+                        session.over = False
+                        session.reason = None
+            elif rtype == REC_SNAPSHOT:
+                # Snapshot po cofnięciu/ponowieniu; w pozostałych przypadkach zgodny ze stanem
+                unpack_board(data, start + SNAPSHOT.size, board)
+        return session
+
+    def state_at(self, move=None):
+        return self.replay(move).board
+
+    def validate(self):
+        # Ponowne rozegranie całej partii od pierwszego snapshotu: wynik każdego
+        # ruchu i każdy późniejszy snapshot muszą się zgadzać z zapisem
+        problems = []
+
+        def check(number, recorded, result):
+            if recorded != result.matched:
+                problems.append(f"Move {number + 1}: recorded matched={recorded}, replay gives {result.matched}")
+
+        session = self.replay(0)
+        first_index = self._snapshot_before(0)[1]
+        data = self._data
+        done = 0
+        board = session.board
+        resync = False
+        for rtype, start, length in self.records[first_index + 1:]:
+            if rtype == REC_MATCH:
+                idx1, idx2, matched = MATCH.unpack_from(data, start)
+                check(done, bool(matched), session.play(board.position(idx1), board.position(idx2)))
+                done += 1
+            elif rtype == REC_REFILL:
+                for offset in range(start, start + length, CELL.size):
+                    idx, value = CELL.unpack_from(data, offset)
+                    board.set_index(idx, value)
+                board.random_count += 1
+            elif rtype == REC_EVENT:
+                code, value = EVENT.unpack_from(data, start)
+                if code in (EVENT_UNDO, EVENT_REDO):
+                    resync = True
+                    session.moves_used = int(value)
+                    if code == EVENT_UNDO:
+                        session.over = False
+                        session.reason = None
+            elif rtype == REC_SNAPSHOT:
+                if resync:
+                    unpack_board(data, start + SNAPSHOT.size, board)
+                    resync = False
+                    continue
+                expected = unpack_board(data, start + SNAPSHOT.size)
+                if expected.cells != board.cells or expected.score != board.score:
+                    problems.append(f"Snapshot after move {done} does not match the replayed board")
+        return problems
+
+
+def restore(filename):
+    return JournalReader(filename).replay()
@@ -0,0 +1,133 @@
+# loadtest.py
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from engine import RULES
+from game_logic import GameBoard
+from server import HOST, PORT, GameServer
+from tracing import Histogram
+
+
+# === Load Client ===
+class LoadClient:
+    # Jedno połączenie, sesje rozgrywane kolejno: zawsze pierwsza legalna
+    # para, dolosowanie gdy brak ruchu. Mierzy czas każdego żądania.
+
+    def __init__(self, reader, writer, stats, rng):
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+        self.rng = rng
+        self.board = GameBoard()
+
+    async def call(self, request):
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        started = time.perf_counter()
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            response = json.loads(line)
+            if "event" not in response:  # powiadomienia o końcu czasu pomijamy
+                break
+        self.stats.latency[request["op"]].record(time.perf_counter() - started)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response
+
+    def _load(self, response):
+        size = response["size"]
+        self.board.load_cells(bytes(int(c) for c in response["cells"]), size)
+
+    async def play_session(self, mode, max_requests):
+        state = await self.call({"op": "new", "mode": mode, "seed": self.rng.getrandbits(32)})
+        sid = state["session"]
+        for _ in range(max_requests):
+            if state["over"]:
+                break
+            self._load(state)
+            pairs = self.board.legal_pairs()
+            if pairs:
+                a, b = min(pairs)
+                state = await self.call({"op": "play", "session": sid, "cells": [a, b]})
+                self.stats.moves += 1
+            else:
+                state = await self.call({"op": "randomize", "session": sid})
+                if state["status"] != "ok":
+                    break
+        await self.call({"op": "close", "session": sid})
+        self.stats.sessions += 1
+
+
+class LoadStats:
+    def __init__(self):
+        self.sessions = 0
+        self.moves = 0
+        self.latency = {op: Histogram() for op in ("new", "play", "randomize", "close")}
+
+    def to_dict(self, wall):
+        return {
+            "sessions": self.sessions,
+            "moves": self.moves,
+            "wall_time": wall,
+            "sessions_per_second": self.sessions / wall if wall else None,
+            "requests_per_second": sum(h.count for h in self.latency.values()) / wall if wall else None,
+            "latency": {op: h.to_dict() for op, h in self.latency.items() if h.count},
+        }
+
+
+async def run_load(host, port, sessions, concurrency, modes, max_requests=500, seed=0):
+    stats = LoadStats()
+    remaining = iter(range(sessions))
+    rng = random.Random(seed)
+
+    async def worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        client = LoadClient(reader, writer, stats, random.Random(rng.getrandbits(64)))
+        try:
+            for i in remaining:
+                await client.play_session(modes[i % len(modes)], max_requests)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats.to_dict(time.perf_counter() - started)
+
+
+async def _main(args):
+    server = None
+    host, port = args.host, args.port
+    if args.spawn_server:
+        # Serwer w tym samym procesie - wygodne, ale dzieli z klientami jeden rdzeń
+        server = await GameServer(host, 0).start()
+        port = server.port
+    try:
+        return await run_load(host, port, args.sessions, args.concurrency, args.mode or list(RULES),
+                              args.max_requests, args.seed)
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the SumUp game server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--sessions", type=int, default=1000, help="łączna liczba rozegranych sesji")
+    parser.add_argument("--concurrency", type=int, default=50, help="liczba równoległych połączeń")
+    parser.add_argument("--mode", action="append", choices=sorted(RULES), help="tryb gry (domyślnie wszystkie)")
+    parser.add_argument("--max-requests", type=int, default=500, help="limit żądań na sesję")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn-server", action="store_true", help="uruchamia serwer w tym procesie")
+    args = parser.parse_args(argv)
+    result = asyncio.run(_main(args))
+    sys.stdout.write(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,49 @@
-import tkinter as tk
-from gui import GameGUI
-from PIL import Image, ImageTk
+import time
+
+STARTED = time.perf_counter()
+
+import sys
+from startup import PROFILE
+
+# --profile-startup: czasy importów, zasobów i budowy okna (JSON, jedna linia
+# na etap) aż do pierwszej narysowanej klatki, po czym program się kończy
+PROFILING = "--profile-startup" in sys.argv[1:]
+if PROFILING:
+    PROFILE.enable(origin=STARTED)
+
+# --trace[=PLIK]: histogramy czasu etapów kliknięcia i akcji; zapis przy
+# zamknięciu i pod klawiszem F9 (.prom/.txt - format Prometheusa, inaczej JSON)
+TRACE_PATH = next((arg.partition("=")[2] or "trace.json" for arg in sys.argv[1:]
+                   if arg == "--trace" or arg.startswith("--trace=")), None)
+
+with PROFILE.phase("import", "tkinter"):
+    import tkinter as tk
+with PROFILE.phase("import", "gui"):
+    from gui import GameGUI
+from sprites import load_image
+
+
+def first_frame(root):
+    PROFILE.mark("first_frame")
+    PROFILE.report()
+    root.destroy()
 
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    icon_image = Image.open("assets/ss.ico")
-    icon_photo = ImageTk.PhotoImage(icon_image)
+    if TRACE_PATH:
+        import atexit
+        from tracing import TRACER
+
+        TRACER.enable()
+        atexit.register(TRACER.export, TRACE_PATH)
+    with PROFILE.phase("widget", "root"):
+        root = tk.Tk()
+    icon_photo = load_image("assets/ss.ico")
     root.iconphoto(False, icon_photo)
-    game = GameGUI(root)
+    with PROFILE.phase("widget", "GameGUI"):
+        game = GameGUI(root)
+    if TRACE_PATH:
+        root.bind("<F9>", lambda event: TRACER.export(TRACE_PATH))
+    if PROFILING:
+        root.after_idle(first_frame, root)
     root.mainloop()
@@ -0,0 +1,366 @@
+# mcts.py
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import RULES, REASON_STUCK, GameSession, pick_refill_rows, refill_rows
+from game_logic import GameBoard
+
+RANDOMIZE = "randomize"
+
+TIME_BUDGET = 1.0
+EXPLORATION = 0.7
+SECONDS_PER_MOVE = 2.0
+MAX_OUTCOMES = 8      # różnych wyników dolosowania pamiętanych w węźle losowym
+ROLLOUT_DEPTH = 200
+
+
+def session_spec(session):
+    # Stan sesji w postaci do przesłania do innego procesu (bez listenerów GUI)
+    board = session.board
+    return (board.cells.tobytes(), board.size, board.mode_name, session.rules, board.score, board.errors,
+            board.random_count, board.elapsed_time, getattr(board, "moves_left", None),
+            session.moves_used, session.over, session.reason)
+
+
+def session_from_spec(spec, rng=None):
+    (cells, size, mode_name, rules, score, errors, random_count, elapsed_time,
+     moves_left, moves_used, over, reason) = spec
+    board = GameBoard(size)
+    board.load_cells(cells, size)
+    board.score = score
+    board.errors = errors
+    board.random_count = random_count
+    board.elapsed_time = elapsed_time
+    if moves_left is not None:
+        board.moves_left = moves_left
+    session = GameSession(mode_name, board=board, rules=rules, rng=rng)
+    session.moves_used = moves_used
+    session.over = over
+    session.reason = reason
+    return session
+
+
+def clone_session(session, rng=None):
+    other = GameSession(session.mode_name, board=session.board.copy(), rules=session.rules, rng=rng)
+    other.moves_used = session.moves_used
+    other.over = session.over
+    other.reason = session.reason
+    return other
+
+
+def can_refill(session):
+    return session.can_randomize() and not session.board.is_board_full()
+
+
+def apply_refill(session, changes):
+    # Dolosowanie o znanym wyniku (zapamiętanym w węźle losowym)
+    board = session.board
+    for idx, value in changes:
+        board.set_index(idx, value)
+    board.random_count += 1
+    if session.is_stuck():
+        session.finish(REASON_STUCK)
+
+
+def sample_refill(session, rng):
+    changes = refill_rows(session.board, pick_refill_rows(session.board), rng)
+    session.board.random_count += 1
+    if session.is_stuck():
+        session.finish(REASON_STUCK)
+    return tuple(changes)
+
+
+class _Node:
+    __slots__ = ("visits", "total", "children", "untried")
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.children = {}
+        self.untried = None
+
+
+class MCTSResult:
+    def __init__(self, action, stats, playouts, wins, elapsed, scale, root_score):
+        self.action = action      # para indeksów, RANDOMIZE albo None
+        self.stats = stats        # akcja -> (odwiedziny, suma nagród)
+        self.playouts = playouts
+        self.wins = wins
+        self.elapsed = elapsed
+        self.scale = scale
+        self.root_score = root_score
+
+    @property
+    def playouts_per_second(self):
+        return self.playouts / self.elapsed if self.elapsed else None
+
+    @property
+    def clear_rate(self):
+        return self.wins / self.playouts if self.playouts else 0.0
+
+    @property
+    def expected_score(self):
+        # Średni wynik końcowy rozgrywek zaczynających się od najlepszej akcji
+        if self.action is None:
+            return self.root_score
+        visits, total = self.stats[self.action]
+        return self.root_score + total / visits * self.scale if visits else self.root_score
+
+    def positions(self, board):
+        if self.action is None or self.action == RANDOMIZE:
+            return self.action
+        return board.position(self.action[0]), board.position(self.action[1])
+
+    def to_dict(self):
+        return {
+            "action": self.action if self.action is None or self.action == RANDOMIZE else list(self.action),
+            "expected_score": self.expected_score,
+            "clear_rate": self.clear_rate,
+            "playouts": self.playouts,
+            "elapsed": self.elapsed,
+            "playouts_per_second": self.playouts_per_second,
+            "actions": [
+                {"action": a if a == RANDOMIZE else list(a), "visits": v, "mean_gain": t / v * self.scale if v else 0.0}
+                for a, (v, t) in sorted(self.stats.items(), key=lambda item: -item[1][0])
+            ],
+        }
+
+
+# === MCTS ===
+class MCTS:
+    # UCT z nagrodą = przyrost wyniku do końca rozgrywki. Dolosowanie to węzeł
+    # losowy: każde wejście losuje nowy wynik, dopóki węzeł nie ma MAX_OUTCOMES
+    # różnych, potem wybiera spośród zapamiętanych. Czas gry płynie o
+    # seconds_per_move na akcję, więc w trybie timed horyzont jest skończony.
+
+    def __init__(self, time_budget=TIME_BUDGET, iterations=None, exploration=EXPLORATION,
+                 seconds_per_move=SECONDS_PER_MOVE, max_outcomes=MAX_OUTCOMES, rollout_depth=ROLLOUT_DEPTH, seed=0):
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.exploration = exploration
+        self.seconds_per_move = seconds_per_move
+        self.max_outcomes = max_outcomes
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+
+    def _actions(self, session):
+        actions = sorted(session.board.legal_pairs())
+        if can_refill(session):
+            actions.append(RANDOMIZE)
+        self.rng.shuffle(actions)
+        return actions
+
+    def _tick(self, session):
+        if session.rules.time_limit is not None and not session.over:
+            session.advance(self.seconds_per_move)
+
+    def _play(self, session, action):
+        board = session.board
+        session.play(board.position(action[0]), board.position(action[1]))
+        self._tick(session)
+
+    def _chance(self, node, session):
+        if len(node.children) < self.max_outcomes:
+            outcome = sample_refill(session, self.rng)
+        else:
+            outcome = self.rng.choice(list(node.children))
+            apply_refill(session, outcome)
+        self._tick(session)
+        child = node.children.get(outcome)
+        if child is None:
+            child = node.children[outcome] = _Node()
+        return child
+
+    def _select(self, node):
+        log_n = math.log(node.visits)
+        c = self.exploration
+        return max(node.children.items(),
+                   key=lambda item: item[1].total / item[1].visits + c * math.sqrt(log_n / item[1].visits))[0]
+
+    def _rollout(self, session):
+        rng = self.rng
+        for _ in range(self.rollout_depth):
+            if session.over:
+                return
+            pairs = session.board.legal_pairs()
+            if pairs:
+                self._play(session, rng.choice(tuple(pairs)))
+            elif can_refill(session):
+                sample_refill(session, rng)
+                self._tick(session)
+            else:
+                return
+
+    def _horizon(self, session):
+        # Skala nagrody: 10 punktów na każdy możliwy jeszcze ruch
+        board = session.board
+        moves = board.occupied // 2 + (session.rules.max_randoms - board.random_count) * board.size
+        if session.moves_left is not None:
+            moves = min(moves, session.moves_left)
+        if session.time_left is not None:
+            moves = min(moves, int(session.time_left / self.seconds_per_move) + 1)
+        return 10.0 * max(1, moves)
+
+    def search(self, session, cancel=None):
+        started = time.perf_counter()
+        deadline = started + self.time_budget if self.time_budget is not None else None
+        root = _Node()
+        root_score = session.board.score
+        scale = self._horizon(session)
+        playouts = wins = 0
+
+        while True:
+            if self.iterations is not None and playouts >= self.iterations:
+                break
+            if deadline is not None and playouts and time.perf_counter() >= deadline:
+                break
+            if cancel is not None and cancel.is_set():
+                break
+            state = clone_session(session, self.rng)
+            node = root
+            path = [node]
+            while not state.over:
+                if node.untried is None:
+                    node.untried = self._actions(state)
+                if node.untried:
+                    action = node.untried.pop()
+                    child = node.children[action] = _Node()
+                elif node.children:
+                    action = self._select(node)
+                    child = node.children[action]
+                else:
+                    break  # brak ruchów i dolosowań - stan końcowy
+                path.append(child)
+                if action == RANDOMIZE:
+                    child = self._chance(child, state)
+                    path.append(child)
+                else:
+                    self._play(state, action)
+                node = child
+                if child.visits == 0:
+                    break
+            self._rollout(state)
+
+            reward = (state.board.score - root_score) / scale
+            for visited in path:
+                visited.visits += 1
+                visited.total += reward
+            playouts += 1
+            wins += state.won
+
+        stats = {action: (child.visits, child.total) for action, child in root.children.items()}
+        action = max(stats, key=lambda a: stats[a][0]) if stats else None
+        return MCTSResult(action, stats, playouts, wins, time.perf_counter() - started, scale, root_score)
+
+
+def _search_task(task):
+    spec, options, seed = task
+    result = MCTS(seed=seed, **options).search(session_from_spec(spec))
+    return result.stats, result.playouts, result.wins, result.elapsed, result.scale, result.root_score
+
+
+def search_parallel(session, workers=None, seed=0, executor=None, **options):
+    # Równoległość na poziomie korzenia: niezależne drzewa w procesach,
+    # statystyki akcji korzenia sumowane, wybór akcji z największą liczbą odwiedzin
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 and executor is None:
+        return MCTS(seed=seed, **options).search(session)
+    spec = session_spec(session)
+    tasks = [(spec, options, seed * 1_000_003 + i) for i in range(workers)]
+    started = time.perf_counter()
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_search_task, tasks))
+    else:
+        parts = list(executor.map(_search_task, tasks))
+    stats = {}
+    playouts = wins = 0
+    for part_stats, part_playouts, part_wins, _, scale, root_score in parts:
+        for action, (visits, total) in part_stats.items():
+            merged = stats.get(action, (0, 0.0))
+            stats[action] = (merged[0] + visits, merged[1] + total)
+        playouts += part_playouts
+        wins += part_wins
+    action = max(stats, key=lambda a: stats[a][0]) if stats else None
+    return MCTSResult(action, stats, playouts, wins, time.perf_counter() - started, scale, root_score)
+
+
+def best_move(session, **options):
+    # (pos1, pos2), RANDOMIZE albo None
+    result = search_parallel(session, **options)
+    return result.positions(session.board), result
+
+
+def rate_board(board, mode="standard", **options):
+    # Trudność planszy: jak często rozgrywki MCTS ją czyszczą i jaki wynik osiągają
+    session = GameSession(mode, board=board.copy(), rules=RULES[mode])
+    result = search_parallel(session, **options)
+    return {
+        "mode": mode,
+        "expected_score": result.expected_score,
+        "clear_rate": result.clear_rate,
+        "difficulty": 1.0 - result.clear_rate,
+        "playouts": result.playouts,
+        "playouts_per_second": result.playouts_per_second,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo tree search for SumUp")
+    parser.add_argument("--mode", default="challenge", choices=sorted(RULES))
+    parser.add_argument("--seed", type=int, default=0, help="ziarno planszy startowej i wyszukiwania")
+    parser.add_argument("--time", type=float, default=TIME_BUDGET, help="budżet czasu na jeden ruch (s)")
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    parser.add_argument("--seconds-per-move", type=float, default=SECONDS_PER_MOVE)
+    parser.add_argument("--play", action="store_true", help="rozgrywa całą partię zamiast jednego ruchu")
+    args = parser.parse_args(argv)
+
+    session = GameSession(args.mode, rng=random.Random(args.seed))
+    session.start()
+    options = {"time_budget": args.time, "seconds_per_move": args.seconds_per_move}
+    workers = args.workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if not args.play:
+            result = search_parallel(session, workers, args.seed, executor, **options)
+            output = result.to_dict()
+        else:
+            moves = []
+            playouts = 0
+            elapsed = 0.0
+            step = 0
+            while not session.over:
+                result = search_parallel(session, workers, args.seed + step, executor, **options)
+                step += 1
+                playouts += result.playouts
+                elapsed += result.elapsed
+                action = result.positions(session.board)
+                if action is None:
+                    session.finish(REASON_STUCK)
+                    break
+                if action == RANDOMIZE:
+                    session.randomize()
+                    moves.append(RANDOMIZE)
+                else:
+                    session.play(*action)
+                    moves.append([session.board.index(p.row, p.col) for p in action])
+                if session.rules.time_limit is not None and not session.over:
+                    session.advance(args.seconds_per_move)
+            output = session.summary()
+            output["actions"] = moves
+            output["playouts"] = playouts
+            output["playouts_per_second"] = playouts / elapsed if elapsed else None
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    sys.stdout.write(json.dumps(output, indent=2, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# policies.py
+import random
+
+from engine import score_for
+from mcts import MCTS, RANDOMIZE
+from solver import Solver
+
+
+# === Policy Classes ===
+class Policy:
+    # choose(session) zwraca parę pozycji, RANDOMIZE albo None (brak ruchu)
+    name = "base"
+
+    def __init__(self, rng=None):
+        self.rng = rng or random
+
+    def choose(self, session):
+        raise NotImplementedError
+
+    def _fallback(self, session):
+        return RANDOMIZE if session.can_randomize() and 0 in session.board.cells else None
+
+
+class RandomPolicy(Policy):
+    name = "random"
+
+    def __init__(self, rng=None, error_rate=0.0):
+        super().__init__(rng)
+        self.error_rate = error_rate
+
+    def choose(self, session):
+        board = session.board
+        if self.error_rate and self.rng.random() < self.error_rate:
+            occupied = [i for i, value in enumerate(board.cells) if value]
+            if len(occupied) >= 2:
+                a, b = self.rng.sample(occupied, 2)
+                return board.position(a), board.position(b)
+
+        pairs = board.legal_pairs()
+        if not pairs:
+            return self._fallback(session)
+        a, b = self.rng.choice(tuple(pairs))
+        return board.position(a), board.position(b)
+
+
+class GreedyPolicy(Policy):
+    # Najwyżej punktowana para (suma 10 przed parą równych wartości)
+    name = "greedy"
+
+    def choose(self, session):
+        board = session.board
+        cells = board.cells
+        best, best_points = [], 0
+        for a, b in board.legal_pairs():
+            points = score_for(cells[a], cells[b])
+            if points > best_points:
+                best, best_points = [(a, b)], points
+            elif points == best_points:
+                best.append((a, b))
+        if not best:
+            return self._fallback(session)
+        a, b = self.rng.choice(sorted(best))
+        return board.position(a), board.position(b)
+
+
+class SolverPolicy(Policy):
+    # Gra według planu z solvera; gdy plansza nie jest rozwiązywalna
+    # w budżecie węzłów, wraca do strategii zachłannej
+    name = "solver"
+
+    def __init__(self, rng=None, max_nodes=20000):
+        super().__init__(rng)
+        self.solver = Solver(max_nodes=max_nodes, table_size=max_nodes)
+        self.greedy = GreedyPolicy(self.rng)
+        self._plan = []
+        self._plan_key = None
+
+    def choose(self, session):
+        board = session.board
+        key = (session, board.random_count)
+        if key != self._plan_key:
+            result = self.solver.solve(board)
+            self._plan = list(reversed(result.moves))
+            self._plan_key = key
+        while self._plan:
+            pos1, pos2 = self._plan.pop()
+            if board.is_match(pos1, pos2):
+                return pos1, pos2
+        return self.greedy.choose(session)
+
+
+class MCTSPolicy(Policy):
+    # Ruch z wyszukiwania MCTS o stałym budżecie czasu na decyzję
+    name = "mcts"
+
+    def __init__(self, rng=None, time_budget=0.05, seconds_per_move=2.0):
+        super().__init__(rng)
+        self.search = MCTS(time_budget=time_budget, seconds_per_move=seconds_per_move,
+                           seed=self.rng.getrandbits(32))
+
+    def choose(self, session):
+        result = self.search.search(session)
+        if result.action is None:
+            return self._fallback(session)
+        return result.positions(session.board)
+
+
+POLICIES = {
+    RandomPolicy.name: RandomPolicy,
+    GreedyPolicy.name: GreedyPolicy,
+    SolverPolicy.name: SolverPolicy,
+    MCTSPolicy.name: MCTSPolicy,
+}
@@ -0,0 +1,135 @@
+# render.py
+import tkinter as tk
+
+DEFAULT_BG = "SystemButtonFace"
+# Od tego rozmiaru planszy GUI rysuje pola na jednym Canvasie zamiast przycisków
+CANVAS_MIN_SIZE = 12
+
+
+# === Board Renderers ===
+class BoardRenderer:
+    # Pamięta ostatnio narysowany stan każdego pola (wartość, tło) i przy
+    # flush() przerysowuje tylko pola zgłoszone przez planszę jako zmienione
+    # albo ze zmienionym podświetleniem.
+
+    def __init__(self, parent, images, on_click, tile=50):
+        self.parent = parent
+        self.images = images
+        self.on_click = on_click
+        self.tile = tile
+        self.board = None
+        self.size = 0
+        self.repaints = 0
+        self._drawn = []
+        self._highlights = {}
+        self._dirty = set()
+
+    def attach(self, board):
+        if self.board is not None:
+            self.board.remove_listener(self._cell_changed)
+        self.board = board
+        board.add_listener(self._cell_changed)
+        if board.size != self.size:
+            self._build(board.size)
+            self.size = board.size
+        self._drawn = [None] * (board.size * board.size)
+        self._highlights.clear()
+        self._dirty = set(range(len(self._drawn)))
+
+    def _cell_changed(self, idx, old, new):
+        self._dirty.add(idx)
+
+    def highlight(self, row, col, color):
+        idx = row * self.size + col
+        self._highlights[idx] = color
+        self._dirty.add(idx)
+
+    def clear_highlights(self):
+        self._dirty.update(self._highlights)
+        self._highlights.clear()
+
+    def flush(self):
+        cells = self.board.cells
+        images = self.images
+        highlights = self._highlights
+        drawn = self._drawn
+        for idx in self._dirty:
+            state = (cells[idx], highlights.get(idx, DEFAULT_BG))
+            if drawn[idx] != state:
+                drawn[idx] = state
+                self._paint(idx, images.get(state[0] or None, images[None]), state[1])
+                self.repaints += 1
+        self._dirty.clear()
+
+    def _build(self, size):
+        raise NotImplementedError
+
+    def _paint(self, idx, image, bg):
+        raise NotImplementedError
+
+
+class ButtonGridRenderer(BoardRenderer):
+    def __init__(self, parent, images, on_click, tile=50):
+        super().__init__(parent, images, on_click, tile)
+        self.buttons = []
+
+    def _build(self, size):
+        for row in self.buttons:
+            for btn in row:
+                btn.destroy()
+        self.buttons = []
+        for i in range(size):
+            row = []
+            for j in range(size):
+                btn = tk.Button(self.parent, image=self.images[None],
+                                command=lambda r=i, c=j: self.on_click(r, c))
+                btn.grid(row=i, column=j, padx=1, pady=1)
+                row.append(btn)
+            self.buttons.append(row)
+
+    def _paint(self, idx, image, bg):
+        row, col = divmod(idx, self.size)
+        self.buttons[row][col].config(image=image, bg=bg)
+
+
+class CanvasRenderer(BoardRenderer):
+    # Jeden Canvas z jednym obrazkiem (i prostokątem tła) na pole zamiast
+    # tysięcy widżetów tk.Button
+    PAD = 2
+
+    def __init__(self, parent, images, on_click, tile=50):
+        super().__init__(parent, images, on_click, tile)
+        self.canvas = tk.Canvas(parent, highlightthickness=0)
+        self.canvas.pack()
+        self.canvas.bind("<Button-1>", self._clicked)
+        self._rects = []
+        self._items = []
+
+    def _build(self, size):
+        canvas = self.canvas
+        canvas.delete("all")
+        pitch = self.tile + self.PAD
+        canvas.config(width=size * pitch, height=size * pitch)
+        self._rects = []
+        self._items = []
+        for i in range(size):
+            for j in range(size):
+                x, y = j * pitch, i * pitch
+                self._rects.append(canvas.create_rectangle(x, y, x + pitch, y + pitch, fill="", outline=""))
+                self._items.append(canvas.create_image(x + pitch // 2, y + pitch // 2, image=self.images[None]))
+
+    def _paint(self, idx, image, bg):
+        self.canvas.itemconfigure(self._items[idx], image=image)
+        self.canvas.itemconfigure(self._rects[idx], fill="" if bg == DEFAULT_BG else bg)
+
+    def _clicked(self, event):
+        pitch = self.tile + self.PAD
+        col = int(self.canvas.canvasx(event.x) // pitch)
+        row = int(self.canvas.canvasy(event.y) // pitch)
+        if 0 <= row < self.size and 0 <= col < self.size:
+            self.on_click(row, col)
+
+
+def make_renderer(parent, images, on_click, size, tile=50):
+    cls = CanvasRenderer if size >= CANVAS_MIN_SIZE else ButtonGridRenderer
+    return cls(parent, images, on_click, tile)
@@ -0,0 +1,184 @@
+# savefile.py
+import mmap
+import os
+import struct
+
+from game_logic import GameBoard
+
+BINARY_EXTENSION = ".sumup"
+ARCHIVE_EXTENSION = ".sumupa"
+
+BOARD_MAGIC = b"SUMB"
+ARCHIVE_MAGIC = b"SUMA"
+VERSION = 1
+
+MODE_CODES = {"standard": 0, "timed": 1, "sniper": 2, "challenge": 3}
+MODE_NAMES = {code: name for name, code in MODE_CODES.items()}
+
+FLAG_MOVES_LEFT = 1
+
+# Nagłówek planszy: magic, wersja, tryb, flagi, rozmiar, score, random_count,
+# errors, elapsed_time, moves_left; za nim size * size bajtów pól (0 = puste)
+BOARD_HEADER = struct.Struct("<4sHBBHxxiIIdi")
+# Nagłówek archiwum: magic, wersja, liczba plansz, offset indeksu
+ARCHIVE_HEADER = struct.Struct("<4sHxxQQ")
+# Wpis indeksu: offset i długość rekordu planszy
+INDEX_ENTRY = struct.Struct("<QI")
+
+
+class SaveFormatError(ValueError):
+    pass
+
+
+def pack_board(board):
+    has_moves = hasattr(board, "moves_left")
+    header = BOARD_HEADER.pack(
+        BOARD_MAGIC, VERSION, MODE_CODES.get(board.mode_name, 0),
+        FLAG_MOVES_LEFT if has_moves else 0, board.size,
+        board.score, board.random_count, board.errors,
+        float(board.elapsed_time), board.moves_left if has_moves else 0,
+    )
+    return header + board.cells.tobytes()
+
+
+def unpack_board(data, offset=0, board=None):
+    try:
+        (magic, version, mode, flags, size, score, random_count,
+         errors, elapsed_time, moves_left) = BOARD_HEADER.unpack_from(data, offset)
+    except struct.error as e:
+        raise SaveFormatError(f"Truncated board header: {e}") from None
+    if magic != BOARD_MAGIC:
+        raise SaveFormatError("Not a SumUp board record")
+    if version > VERSION:
+        raise SaveFormatError(f"Unsupported board format version {version}")
+    if size <= 0:
+        raise SaveFormatError(f"Invalid board size {size}")
+    start = offset + BOARD_HEADER.size
+    cells = bytes(data[start:start + size * size])
+    if len(cells) != size * size:
+        raise SaveFormatError("Truncated board cells")
+    # Bajty czytane bez znaku: wartość ujemna w array('b') daje tu >= 128
+    if max(cells) > 9:
+        raise SaveFormatError("Board cell value out of range 0-9")
+
+    board = board if board is not None else GameBoard(size)
+    board.load_cells(cells, size)
+    board.mode_name = MODE_NAMES.get(mode, "standard")
+    board.score = score
+    board.random_count = random_count
+    board.errors = errors
+    board.elapsed_time = elapsed_time
+    if flags & FLAG_MOVES_LEFT:
+        board.moves_left = moves_left
+    elif hasattr(board, "moves_left"):
+        del board.moves_left
+    return board
+
+
+def save_binary(board, filename):
+    with open(filename, "wb") as f:
+        f.write(pack_board(board))
+
+
+def load_binary(filename, board=None):
+    with open(filename, "rb") as f:
+        return unpack_board(f.read(), board=board)
+
+
+# === Archive Classes ===
+class ArchiveWriter:
+    # Wiele plansz w jednym pliku: rekordy jeden za drugim, na końcu indeks
+    # offsetów; nagłówek uzupełniany przy zamknięciu
+
+    def __init__(self, filename):
+        self._file = open(filename, "wb")
+        self._file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, VERSION, 0, 0))
+        self._index = []
+
+    def add(self, board):
+        record = pack_board(board)
+        self._index.append((self._file.tell(), len(record)))
+        self._file.write(record)
+
+    def close(self):
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        self._file.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in self._index))
+        self._file.seek(0)
+        self._file.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, VERSION, len(self._index), index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class Archive:
+    # Odczyt przez mmap: dowolna plansza bez parsowania pozostałych
+
+    def __init__(self, filename):
+        self._file = open(filename, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SaveFormatError("Empty archive file") from None
+        try:
+            magic, version, count, index_offset = ARCHIVE_HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            self.close()
+            raise SaveFormatError("Truncated archive header") from None
+        if magic != ARCHIVE_MAGIC:
+            self.close()
+            raise SaveFormatError("Not a SumUp archive")
+        if version > VERSION:
+            self.close()
+            raise SaveFormatError(f"Unsupported archive format version {version}")
+        self._count = count
+        self._index_offset = index_offset
+
+    def __len__(self):
+        return self._count
+
+    def _entry(self, i):
+        if not -self._count <= i < self._count:
+            raise IndexError("archive index out of range")
+        i %= self._count
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + i * INDEX_ENTRY.size)
+
+    def __getitem__(self, i):
+        offset, _ = self._entry(i)
+        return unpack_board(self._map, offset)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def raw(self, i):
+        offset, length = self._entry(i)
+        return self._map[offset:offset + length]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def write_archive(filename, boards):
+    with ArchiveWriter(filename) as writer:
+        for board in boards:
+            writer.add(board)
+
+
+def is_binary_path(filename):
+    return os.path.splitext(filename)[1].lower() == BINARY_EXTENSION
@@ -0,0 +1,151 @@
+# scheduler.py
+import math
+import time
+
+EPSILON = 1e-6
+
+
+class MonotonicClock:
+    def now(self):
+        return time.monotonic()
+
+
+class VirtualClock:
+    # Czas przesuwany ręcznie - rozgrywki bez Tk (testy, symulacje)
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return self.time
+
+    def advance(self, seconds):
+        self.time += seconds
+
+
+class _Entry:
+    __slots__ = ("due", "period", "callback")
+
+    def __init__(self, due, period, callback):
+        self.due = due
+        self.period = period
+        self.callback = callback
+
+
+# === Tick Scheduler ===
+class TickScheduler:
+    # Wspólny zegar rozgrywki: liczy czas gry z pauzami i budzi się tylko
+    # na najbliższą granicę okresu albo termin któregoś subskrybenta.
+    # Subskrybenci dostają czas gry w chwili zmiany, nie w chwili wybudzenia.
+
+    def __init__(self, clock=None, after=None, after_cancel=None):
+        self.clock = clock or MonotonicClock()
+        self._after = after
+        self._after_cancel = after_cancel
+        self._timer = None
+        self._entries = []
+        self._base = 0.0
+        self._started = None  # odczyt zegara przy starcie/wznowieniu; None = zatrzymany
+        self.wakeups = 0
+
+    @property
+    def running(self):
+        return self._started is not None
+
+    def elapsed(self):
+        if self._started is None:
+            return self._base
+        return self._base + self.clock.now() - self._started
+
+    @staticmethod
+    def _next_boundary(elapsed, period):
+        return (math.floor(elapsed / period + EPSILON) + 1) * period
+
+    def every(self, period, callback):
+        # callback(czas) przy każdej pełnej wielokrotności okresu
+        entry = _Entry(self._next_boundary(self.elapsed(), period), period, callback)
+        self._entries.append(entry)
+        self._reschedule()
+        return entry
+
+    def at(self, elapsed, callback):
+        # Jednorazowo, gdy czas gry osiągnie podaną wartość
+        entry = _Entry(elapsed, None, callback)
+        self._entries.append(entry)
+        self._reschedule()
+        return entry
+
+    def cancel(self, entry):
+        if entry in self._entries:
+            self._entries.remove(entry)
+            self._reschedule()
+
+    def start(self, elapsed=0.0):
+        self._base = elapsed
+        self._started = self.clock.now()
+        for entry in self._entries:
+            if entry.period is not None:
+                entry.due = self._next_boundary(elapsed, entry.period)
+        self._reschedule()
+
+    def pause(self):
+        if self._started is not None:
+            self._base = self.elapsed()
+            self._started = None
+            self._cancel_timer()
+
+    def resume(self):
+        if self._started is None:
+            self._started = self.clock.now()
+            self._reschedule()
+
+    def stop(self):
+        # Zatrzymuje zegar i usuwa subskrypcje; elapsed() zostaje do odczytu
+        self.pause()
+        self._entries.clear()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._after_cancel(self._timer)
+            self._timer = None
+
+    def _reschedule(self):
+        self._cancel_timer()
+        if self._after is None or self._started is None or not self._entries:
+            return
+        delay = min(entry.due for entry in self._entries) - self.elapsed()
+        self._timer = self._after(max(0, math.ceil(delay * 1000)), self._fire)
+
+    def _fire(self):
+        self._timer = None
+        self.wakeups += 1
+        self._run_due(self.elapsed())
+        self._reschedule()
+
+    def _run_due(self, now):
+        due = sorted((e for e in self._entries if e.due <= now + EPSILON), key=lambda e: e.due)
+        for entry in due:
+            if entry not in self._entries:
+                continue  # anulowany przez wcześniejszy callback
+            if entry.period is None:
+                self._entries.remove(entry)
+                at = entry.due
+            else:
+                # Pominięte granice (np. zamrożona pętla) łączone w jedno wywołanie
+                at = math.floor(now / entry.period + EPSILON) * entry.period
+                entry.due = self._next_boundary(now, entry.period)
+            entry.callback(at)
+            if self._started is None:
+                break
+
+    def advance(self, seconds):
+        # Tryb bez pętli zdarzeń: przesuwa wirtualny zegar kolejno do każdego terminu
+        target = self.elapsed() + seconds
+        while self._started is not None and self._entries:
+            nearest = min(entry.due for entry in self._entries)
+            if nearest > target:
+                break
+            self.clock.advance(max(0.0, nearest - self.elapsed()))
+            self.wakeups += 1
+            self._run_due(nearest)
+        if self._started is not None:
+            self.clock.advance(max(0.0, target - self.elapsed()))
@@ -0,0 +1,167 @@
+# scores.py
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+
+DB_PATH = "scores.db"
+BATCH_SIZE = 500
+FLUSH_TIMEOUT = 1.0  # najdłuższe czekanie wątku Tk na zapis przed odczytem wyników
+
+SOURCE_GUI = "gui"
+SOURCE_SIMULATION = "simulation"
+
+COLUMNS = ("finished_at", "mode", "score", "elapsed_time", "errors", "random_count",
+           "moves", "won", "reason", "source")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    elapsed_time REAL NOT NULL,
+    errors INTEGER NOT NULL,
+    random_count INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    reason TEXT,
+    source TEXT NOT NULL
+);
+-- Ranking trybu: najwyższy wynik, przy remisie krótszy czas
+CREATE INDEX IF NOT EXISTS games_mode_score ON games (mode, score DESC, elapsed_time);
+-- Rekordy osobiste (tylko gry z GUI) bez przeglądania wyników symulacji
+CREATE INDEX IF NOT EXISTS games_source_mode_score ON games (source, mode, score DESC, elapsed_time);
+-- Zakresy czasu: wszystkie gry albo tylko jeden tryb
+CREATE INDEX IF NOT EXISTS games_finished ON games (finished_at);
+CREATE INDEX IF NOT EXISTS games_mode_finished ON games (mode, finished_at);
+"""
+
+INSERT = f"INSERT INTO games ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def summary_row(summary, source=SOURCE_GUI, finished_at=None):
+    # Wiersz tabeli z GameSession.summary()
+    return (
+        finished_at if finished_at is not None else time.time(),
+        summary["mode"], summary["score"], float(summary["elapsed_time"]), summary["errors"],
+        summary["random_count"], summary["moves"], int(bool(summary["won"])), summary["reason"], source,
+    )
+
+
+# === Score Store ===
+class ScoreStore:
+    # Zapytania i zapis wsadowy; każde zapytanie korzysta z jednego z indeksów
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.conn = connect(path)
+
+    def add_many(self, rows):
+        with self.conn:
+            self.conn.executemany(INSERT, rows)
+
+    def top(self, mode, limit=10, source=None):
+        if source is None:
+            sql = "SELECT * FROM games WHERE mode = ? ORDER BY score DESC, elapsed_time LIMIT ?"
+            return self.conn.execute(sql, (mode, limit)).fetchall()
+        sql = "SELECT * FROM games WHERE source = ? AND mode = ? ORDER BY score DESC, elapsed_time LIMIT ?"
+        return self.conn.execute(sql, (source, mode, limit)).fetchall()
+
+    def personal_best(self, mode, source=SOURCE_GUI):
+        rows = self.top(mode, 1, source)
+        return rows[0] if rows else None
+
+    def between(self, start, end, mode=None, limit=None):
+        sql = "SELECT * FROM games WHERE finished_at >= ? AND finished_at < ?"
+        params = [start, end]
+        if mode is not None:
+            sql += " AND mode = ?"
+            params.append(mode)
+        sql += " ORDER BY finished_at"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def count(self, mode=None):
+        if mode is None:
+            return self.conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM games WHERE mode = ?", (mode,)).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+# === Async Writer ===
+class ScoreWriter:
+    # Zapis w osobnym wątku: wszystko, co czeka w kolejce (do BATCH_SIZE),
+    # trafia do bazy jedną transakcją - im więcej zapisów naraz, tym większe
+    # paczki. Wątek Tk tylko wrzuca do kolejki. Przy wyjściu kolejka jest opróżniana.
+
+    _STOP = object()
+
+    def __init__(self, path=DB_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row):
+        self._queue.put(row)
+
+    def flush(self, timeout=None):
+        # Jak Queue.join, ale z limitem czasu; False, gdy kolejka nie zdążyła się opróżnić
+        done = self._queue.all_tasks_done
+        with done:
+            return done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self):
+        # Baza otwierana przy pierwszej paczce; błąd otwarcia liczony jak błąd
+        # zapisu, a task_done wołane zawsze, żeby flush() nie czekał w nieskończoność
+        store = None
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            while True:
+                if item is self._STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    if store is None:
+                        store = ScoreStore(self.path)
+                    store.add_many(batch)
+            except (sqlite3.Error, OSError):
+                self.errors += 1
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._queue.task_done()
+        if store is not None:
+            store.close()
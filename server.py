@@ -0,0 +1,295 @@
+# server.py
+import argparse
+import asyncio
+import contextlib
+import heapq
+import itertools
+import json
+import random
+import sys
+
+from engine import RULES, REASON_TIME, GameSession
+
+HOST = "127.0.0.1"
+PORT = 8765
+IDLE_TIMEOUT = 300.0
+MAX_LINE = 64 * 1024
+
+TIMER_DEADLINE = 0  # koniec czasu w trybie timed
+TIMER_IDLE = 1      # porzucona sesja
+
+
+class ProtocolError(Exception):
+    pass
+
+
+DIGITS = bytes.maketrans(bytes(range(10)), b"0123456789")
+
+
+def board_text(board):
+    # Plansza jako ciąg cyfr wierszami, "0" = puste pole
+    return board.cells.tobytes().translate(DIGITS).decode("ascii")
+
+
+class _Hosted:
+    # Sesja na serwerze: stan gry i kilka liczb, bez obiektów na zapas
+    __slots__ = ("session", "owner", "started", "synced", "touched")
+
+    def __init__(self, session, owner, now):
+        self.session = session
+        self.owner = owner
+        self.started = now
+        self.synced = now
+        self.touched = now
+
+
+# === Game Server ===
+class GameServer:
+    # Wiele sesji w jednym procesie; protokół: jedna linia JSON na żądanie
+    # i odpowiedź. Terminy wszystkich sesji w jednym kopcu obsługiwanym
+    # przez jedno zadanie, które śpi do najbliższego terminu.
+
+    def __init__(self, host=HOST, port=PORT, idle_timeout=IDLE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.served = 0
+        self._ids = itertools.count(1)
+        self._timers = []
+        self._wakeup = None
+        self._server = None
+        self._timer_task = None
+        self._writers = set()
+        self._handlers = set()  # zadania obsługi połączeń, czekamy na nie przy zamknięciu
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._timer_task = asyncio.create_task(self._run_timers())
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        # Zadania połączeń kończą się same po zamknięciu gniazd; bez czekania na nie
+        # asyncio.run anulowałby je przy wyjściu (traceback CancelledError na 3.11)
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._timer_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._timer_task
+
+    # --- timery ---
+    def _schedule(self, at, sid, kind):
+        if len(self._timers) > 2 * len(self.sessions) + 1024:
+            # Wpisy zamkniętych sesji usuwane hurtem, gdy przeważają w kopcu
+            self._timers = [entry for entry in self._timers if entry[1] in self.sessions]
+            heapq.heapify(self._timers)
+        first = not self._timers or at < self._timers[0][0]
+        heapq.heappush(self._timers, (at, sid, kind))
+        if first:
+            self._wakeup.set()
+
+    async def _run_timers(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+            while self._timers and self._timers[0][0] <= now:
+                at, sid, kind = heapq.heappop(self._timers)
+                self._expire(sid, kind, at, now)
+            timeout = self._timers[0][0] - now if self._timers else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def _expire(self, sid, kind, at, now):
+        hosted = self.sessions.get(sid)
+        if hosted is None:
+            return  # wpis po zamkniętej sesji - usuwany leniwie
+        if kind == TIMER_IDLE:
+            if hosted.touched + self.idle_timeout > at:
+                self._schedule(hosted.touched + self.idle_timeout, sid, TIMER_IDLE)
+            else:
+                del self.sessions[sid]
+            return
+        session = hosted.session
+        if session.over:
+            return
+        self._sync(hosted, now)
+        session.finish(REASON_TIME)
+        self._notify(hosted, {"event": "over", "session": sid, "reason": session.reason,
+                              "score": session.board.score})
+
+    def _notify(self, hosted, message):
+        writer = hosted.owner
+        if writer is not None and not writer.is_closing():
+            writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+
+    @staticmethod
+    def _sync(hosted, now):
+        # Czas gry liczony przy każdym żądaniu, bez osobnego timera na sekundę
+        session = hosted.session
+        if not session.over:
+            session.advance(now - hosted.synced)
+        hosted.synced = now
+
+    # --- połączenia ---
+    async def _handle(self, reader, writer):
+        owned = set()
+        self._writers.add(writer)
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ProtocolError("request must be an object")
+                    response = self.dispatch(request, writer, owned)
+                except (ValueError, ProtocolError) as e:
+                    response = {"ok": False, "error": str(e)}
+                if isinstance(request, dict) and "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    break
+        finally:
+            for sid in owned:
+                self.sessions.pop(sid, None)
+            self._writers.discard(writer)
+            self._handlers.discard(task)
+            writer.close()
+
+    def dispatch(self, request, writer=None, owned=None):
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+        if handler is None:
+            raise ProtocolError(f"unknown op {op!r}")
+        self.served += 1
+        now = asyncio.get_running_loop().time()
+        if op in ("new", "stats"):
+            return handler(request, now, writer, owned)
+        sid = request.get("session")
+        if not isinstance(sid, int) or isinstance(sid, bool):
+            raise ProtocolError("session must be an integer")
+        hosted = self.sessions.get(sid)
+        if hosted is None:
+            raise ProtocolError("unknown session")
+        hosted.touched = now
+        self._sync(hosted, now)
+        return handler(request, hosted, now, owned)
+
+    def _state(self, hosted):
+        session = hosted.session
+        board = session.board
+        return {
+            "ok": True, "size": board.size, "cells": board_text(board), "score": board.score,
+            "errors": board.errors, "random_count": board.random_count, "moves_left": session.moves_left,
+            "time_left": session.time_left, "over": session.over, "reason": session.reason,
+        }
+
+    def op_new(self, request, now, writer, owned):
+        mode = request.get("mode", "standard")
+        if mode not in RULES:
+            raise ProtocolError(f"unknown mode {mode!r}")
+        # Własny generator tylko dla sesji z podanym ziarnem; reszta dzieli wspólny
+        seed = request.get("seed")
+        if seed is not None and (not isinstance(seed, (int, str)) or isinstance(seed, bool)):
+            raise ProtocolError("seed must be an integer or a string")
+        session = GameSession(mode, rng=random.Random(seed) if seed is not None else None)
+        session.start()
+        sid = next(self._ids)
+        hosted = self.sessions[sid] = _Hosted(session, writer, now)
+        if owned is not None:
+            owned.add(sid)
+        if session.rules.time_limit is not None:
+            self._schedule(now + session.rules.time_limit, sid, TIMER_DEADLINE)
+        self._schedule(now + self.idle_timeout, sid, TIMER_IDLE)
+        response = self._state(hosted)
+        response["session"] = sid
+        response["mode"] = mode
+        return response
+
+    def op_state(self, request, hosted, now, owned):
+        return self._state(hosted)
+
+    def op_play(self, request, hosted, now, owned):
+        session = hosted.session
+        if session.over:
+            raise ProtocolError("game is over")
+        board = session.board
+        try:
+            a, b = (int(i) for i in request["cells"])
+        except (KeyError, TypeError, ValueError):
+            raise ProtocolError("play needs cells: [index1, index2]") from None
+        if not (0 <= a < len(board.cells) and 0 <= b < len(board.cells)):
+            raise ProtocolError("cell index out of range")
+        if a == b:
+            raise ProtocolError("cells must differ")
+        result = session.play(board.position(a), board.position(b))
+        response = self._state(hosted)
+        response["matched"] = result.matched
+        response["points"] = result.points
+        return response
+
+    def op_randomize(self, request, hosted, now, owned):
+        if hosted.session.over:
+            raise ProtocolError("game is over")
+        status = hosted.session.randomize()
+        response = self._state(hosted)
+        response["status"] = status
+        return response
+
+    def op_close(self, request, hosted, now, owned):
+        sid = request["session"]
+        self.sessions.pop(sid, None)
+        if owned is not None:
+            owned.discard(sid)
+        response = self._state(hosted)
+        response["summary"] = hosted.session.summary()
+        return response
+
+    def op_stats(self, request, now, writer, owned):
+        return {"ok": True, "sessions": len(self.sessions), "timers": len(self._timers), "served": self.served}
+
+
+async def run_server(host=HOST, port=PORT, idle_timeout=IDLE_TIMEOUT):
+    server = await GameServer(host, port, idle_timeout).start()
+    sys.stderr.write(f"SumUp server on {server.host}:{server.port}\n")
+    await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SumUp game server (JSON lines over TCP)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="sekundy bez żądań, po których sesja jest usuwana")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_server(args.host, args.port, args.idle_timeout))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
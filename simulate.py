@@ -0,0 +1,209 @@
+# simulate.py
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import RULES, REASON_STUCK, REFILL_OK, GameSession
+from policies import POLICIES, RANDOMIZE
+from scores import SOURCE_SIMULATION, ScoreStore, summary_row
+
+MAX_CHUNK = 5000
+
+
+def play_game(rules, policy, rng, seconds_per_move=2.0):
+    session = GameSession(rules.name, rules=rules, rng=rng)
+    session.start()
+    while not session.over:
+        action = policy.choose(session)
+        if action is None:
+            session.finish(REASON_STUCK)
+            break
+        if action == RANDOMIZE:
+            if session.randomize() != REFILL_OK:
+                session.finish(REASON_STUCK)
+                break
+        else:
+            session.play(*action)
+        session.advance(seconds_per_move)
+    return session
+
+
+def percentile(histogram, q):
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen > rank:
+            return value
+    return max(histogram)
+
+
+# === Simulation Stats ===
+class SimulationStats:
+    def __init__(self, mode):
+        self.mode = mode
+        self.games = 0
+        self.wins = 0
+        self.scores = Counter()
+        self.moves = Counter()
+        self.errors = 0
+        self.randoms = 0
+        self.elapsed_time = 0.0
+        self.reasons = Counter()
+        self.records = None  # wiersze do scores.db, gdy symulacja je zapisuje
+
+    def add(self, summary):
+        self.games += 1
+        self.wins += summary["won"]
+        self.scores[summary["score"]] += 1
+        self.moves[summary["moves"]] += 1
+        self.errors += summary["errors"]
+        self.randoms += summary["random_count"]
+        self.elapsed_time += summary["elapsed_time"]
+        self.reasons[summary["reason"]] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        self.scores.update(other.scores)
+        self.moves.update(other.moves)
+        self.errors += other.errors
+        self.randoms += other.randoms
+        self.elapsed_time += other.elapsed_time
+        self.reasons.update(other.reasons)
+        return self
+
+    def _distribution(self, histogram):
+        total = sum(value * count for value, count in histogram.items())
+        return {
+            "mean": total / self.games if self.games else None,
+            "min": min(histogram) if histogram else None,
+            "p50": percentile(histogram, 0.50),
+            "p90": percentile(histogram, 0.90),
+            "p99": percentile(histogram, 0.99),
+            "max": max(histogram) if histogram else None,
+            "histogram": {str(value): histogram[value] for value in sorted(histogram)},
+        }
+
+    def to_dict(self):
+        games = self.games or 1
+        return {
+            "mode": self.mode,
+            "games": self.games,
+            "wins": self.wins,
+            "win_rate": self.wins / games,
+            "score": self._distribution(self.scores),
+            "moves": self._distribution(self.moves),
+            "mean_errors": self.errors / games,
+            "mean_random_count": self.randoms / games,
+            "mean_elapsed_time": self.elapsed_time / games,
+            "end_reasons": dict(self.reasons.most_common()),
+        }
+
+
+def run_chunk(task):
+    rules, policy_name, games, seed, seconds_per_move, record = task
+    rng = random.Random(seed)
+    policy = POLICIES[policy_name](rng)
+    stats = SimulationStats(rules.name)
+    if record:
+        stats.records = []
+    for _ in range(games):
+        summary = play_game(rules, policy, rng, seconds_per_move).summary()
+        stats.add(summary)
+        if record:
+            stats.records.append(summary_row(summary, SOURCE_SIMULATION))
+    return stats
+
+
+def make_tasks(rules, policy_name, games, workers, seed, seconds_per_move, record=False):
+    # Paczki na tyle małe, by wyrównać obciążenie procesów
+    chunk = max(1, min(MAX_CHUNK, -(-games // (workers * 8))))
+    tasks = []
+    for i, start in enumerate(range(0, games, chunk)):
+        tasks.append((rules, policy_name, min(chunk, games - start), seed * 1_000_003 + i, seconds_per_move, record))
+    return tasks
+
+
+def run_simulation(rules, policy_name="greedy", games=1000, workers=None, seed=0, seconds_per_move=2.0,
+                   store=None):
+    # store: opcjonalny scores.ScoreStore - każda gra zapisywana jako wiersz
+    workers = workers or os.cpu_count() or 1
+    tasks = make_tasks(rules, policy_name, games, workers, seed, seconds_per_move, store is not None)
+    stats = SimulationStats(rules.name)
+
+    def collect(partial):
+        if store is not None:
+            store.add_many(partial.records)
+            partial.records = None
+        stats.merge(partial)
+
+    if workers == 1:
+        for task in tasks:
+            collect(run_chunk(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for partial in executor.map(run_chunk, tasks):
+                collect(partial)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless SumUp simulations")
+    parser.add_argument("--games", type=int, default=10000, help="liczba gier na tryb")
+    parser.add_argument("--mode", action="append", choices=sorted(RULES), help="tryb gry (domyślnie wszystkie)")
+    parser.add_argument("--policy", default="greedy", choices=sorted(POLICIES))
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie wszystkie rdzenie)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seconds-per-move", type=float, default=2.0, help="czas gry na jedną akcję")
+    parser.add_argument("--time-limit", type=float, default=None, help="nadpisuje limit czasu trybu timed")
+    parser.add_argument("--max-moves", type=int, default=None, help="nadpisuje budżet ruchów trybu challenge")
+    parser.add_argument("--max-errors", type=int, default=None)
+    parser.add_argument("--output", default=None, help="plik JSON z wynikami (domyślnie stdout)")
+    parser.add_argument("--record-db", default=None, metavar="PATH",
+                        help="zapisuje każdą grę do bazy wyników SQLite")
+    args = parser.parse_args(argv)
+    store = ScoreStore(args.record_db) if args.record_db else None
+
+    results = []
+    for mode in args.mode or list(RULES):
+        rules = RULES[mode]
+        if args.time_limit is not None and rules.time_limit is not None:
+            rules = rules.replace(time_limit=args.time_limit)
+        if args.max_moves is not None and rules.max_moves is not None:
+            rules = rules.replace(max_moves=args.max_moves)
+        if args.max_errors is not None:
+            rules = rules.replace(max_errors=args.max_errors)
+
+        started = time.perf_counter()
+        stats = run_simulation(rules, args.policy, args.games, args.workers, args.seed, args.seconds_per_move,
+                               store)
+        wall = time.perf_counter() - started
+        result = stats.to_dict()
+        result["policy"] = args.policy
+        result["rules"] = dict(rules.__dict__)
+        result["wall_time"] = wall
+        result["games_per_second"] = stats.games / wall if wall else None
+        results.append(result)
+
+    if store is not None:
+        store.close()
+
+    text = json.dumps({"results": results}, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# solver.py
+import random
+import time
+from collections import OrderedDict
+
+from game_logic import EMPTY
+
+# Grupy wartości, które mogą się nawzajem zbijać (v, v) lub (v, 10 - v)
+VALUE_GROUPS = ((1, 9), (2, 8), (3, 7), (4, 6), (5,))
+
+
+def board_symmetries(size):
+    # Permutacje indeksów dla 8 symetrii kwadratu; reguły dopasowania
+    # (poziom, pion, przekątne) są względem nich niezmiennicze
+    last = size - 1
+    transforms = (
+        lambda r, c: (r, c),
+        lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c),
+        lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c),
+        lambda r, c: (last - r, c),
+        lambda r, c: (c, r),
+        lambda r, c: (last - c, last - r),
+    )
+    perms = []
+    for transform in transforms:
+        perm = []
+        for idx in range(size * size):
+            row, col = transform(*divmod(idx, size))
+            perm.append(row * size + col)
+        perms.append(perm)
+    return perms
+
+
+class SolveResult:
+    def __init__(self, status, moves, nodes, cache_hits, cache_lookups, evictions, elapsed):
+        self.status = status  # "solved", "unsolvable" albo "unknown" (wyczerpany budżet)
+        self.moves = moves
+        self.nodes = nodes
+        self.cache_hits = cache_hits
+        self.cache_lookups = cache_lookups
+        self.evictions = evictions
+        self.elapsed = elapsed
+
+    @property
+    def solvable(self):
+        if self.status == "unknown":
+            return None
+        return self.status == "solved"
+
+    @property
+    def hit_rate(self):
+        return self.cache_hits / self.cache_lookups if self.cache_lookups else 0.0
+
+    def stats(self):
+        return {
+            "status": self.status,
+            "moves": len(self.moves),
+            "nodes": self.nodes,
+            "cache_hits": self.cache_hits,
+            "cache_lookups": self.cache_lookups,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "elapsed": self.elapsed,
+        }
+
+    def __repr__(self):
+        return f"SolveResult({self.status!r}, moves={len(self.moves)}, nodes={self.nodes})"
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class _Frame:
+    __slots__ = ("key", "sym", "sleep", "moves", "next", "done", "move", "values")
+
+    def __init__(self, key, sym, sleep, moves, move, values):
+        self.key = key
+        self.sym = sym
+        self.sleep = sleep
+        self.moves = moves
+        self.next = 0
+        self.done = []
+        self.move = move
+        self.values = values
+
+
+class Solver:
+    # Przeszukiwanie w głąb po legalnych parach. Każdy ruch zdejmuje dokładnie
+    # dwa pola, więc każde rozwiązanie ma len(zajęte) / 2 ruchów - pierwsze
+    # znalezione jest zarazem minimalne.
+    #
+    # Ruchy rozłączne i legalne w tym samym stanie są przemienne (zdejmowanie
+    # pól tylko otwiera linie), dlatego stosujemy zbiory uśpionych ruchów:
+    # kolejność A, B jest badana tylko raz. Tablica transpozycji trzyma stany
+    # martwe razem ze zbiorem uśpionym, z którym je przeszukano.
+
+    def __init__(self, table_size=1_000_000, max_nodes=None, time_limit=None, symmetry=True, seed=0):
+        self.table_size = table_size
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.symmetry = symmetry
+        self.seed = seed
+        self._zobrist = {}
+
+    def _keys(self, size):
+        # Klucze Zobrista dla (pole, wartość), osobno dla każdej symetrii
+        keys = self._zobrist.get(size)
+        if keys is None:
+            rng = random.Random(self.seed * 1_000_003 + size)
+            base = [rng.getrandbits(64) for _ in range(size * size * 10)]
+            perms = board_symmetries(size) if self.symmetry else [list(range(size * size))]
+            keys = (perms, [[base[perm[idx] * 10 + v] if v else 0
+                             for idx in range(size * size) for v in range(10)] for perm in perms])
+            self._zobrist[size] = keys
+        return keys
+
+    def solve(self, board, cancel=None):
+        # cancel: opcjonalny threading.Event - przerywa szukanie z wynikiem "unknown"
+        started = time.perf_counter()
+        self._cancel = cancel
+        self._nodes = 0
+        self._hits = 0
+        self._lookups = 0
+        self._evictions = 0
+        self._started = started
+        self._table = OrderedDict()
+
+        board = board.copy()
+        status, moves = "unsolvable", []
+        if self._parity_ok(board):
+            try:
+                path = self._search(board)
+            except _BudgetExceeded:
+                status = "unknown"
+            else:
+                if path is not None:
+                    status = "solved"
+                    moves = [(board.position(a), board.position(b)) for a, b in path]
+
+        return SolveResult(status, moves, self._nodes, self._hits, self._lookups,
+                           self._evictions, time.perf_counter() - started)
+
+    def _parity_ok(self, board):
+        counts = board.value_counts
+        return all(sum(counts[v] for v in group) % 2 == 0 for group in VALUE_GROUPS)
+
+    def _check_budget(self):
+        self._nodes += 1
+        if self.max_nodes is not None and self._nodes > self.max_nodes:
+            raise _BudgetExceeded()
+        if self._cancel is not None and self._nodes % 256 == 0 and self._cancel.is_set():
+            raise _BudgetExceeded()
+        if self.time_limit is not None and self._nodes % 1024 == 0:
+            if time.perf_counter() - self._started > self.time_limit:
+                raise _BudgetExceeded()
+
+    @staticmethod
+    def _map(move, perm):
+        a, b = perm[move[0]], perm[move[1]]
+        return (a, b) if a < b else (b, a)
+
+    def _ordered_moves(self, board):
+        # Najpierw ruchy "wymuszone": pola z najmniejszą liczbą partnerów
+        pairs = board.legal_pairs()
+        degree = {}
+        for a, b in pairs:
+            degree[a] = degree.get(a, 0) + 1
+            degree[b] = degree.get(b, 0) + 1
+        return sorted(pairs, key=lambda m: (degree[m[0]] + degree[m[1]], m))
+
+    def _enter(self, board, hashes, sleep, move, values):
+        self._check_budget()
+        perms = self._perms
+        sym = min(range(len(hashes)), key=hashes.__getitem__)
+        key = hashes[sym]
+
+        moves = self._ordered_moves(board)
+        moves = [m for m in moves if m not in sleep]
+
+        self._lookups += 1
+        stored = self._table.get(key)
+        if stored is not None:
+            perm = perms[sym]
+            current = frozenset(self._map(m, perm) for m in sleep)
+            if stored <= current:
+                self._hits += 1
+                self._table.move_to_end(key)
+                return None
+            # Ruchy spoza zapisanego zbioru zostały już zbadane z tego stanu
+            moves = [m for m in moves if self._map(m, perm) in stored]
+
+        return _Frame(key, sym, sleep, moves, move, values)
+
+    def _store_dead(self, frame):
+        perm = self._perms[frame.sym]
+        self._table[frame.key] = frozenset(self._map(m, perm) for m in frame.sleep)
+        self._table.move_to_end(frame.key)
+        if len(self._table) > self.table_size:
+            self._table.popitem(last=False)
+            self._evictions += 1
+
+    def _search(self, board):
+        perms, keys = self._keys(board.size)
+        self._perms = perms
+        cells = board.cells
+        hashes = [0] * len(perms)
+        for idx, value in enumerate(cells):
+            if value:
+                for s, table in enumerate(keys):
+                    hashes[s] ^= table[idx * 10 + value]
+        remaining = len(cells) - cells.tobytes().count(EMPTY)
+
+        if remaining == 0:
+            return []
+        root = self._enter(board, hashes, frozenset(), None, None)
+        if root is None:
+            return None
+        stack = [root]
+
+        while stack:
+            frame = stack[-1]
+            if frame.next >= len(frame.moves):
+                # Wszystkie ruchy zbadane: stan martwy, cofamy ruch rodzica
+                self._store_dead(frame)
+                stack.pop()
+                if frame.move is not None:
+                    (a, b), (va, vb) = frame.move, frame.values
+                    board.set_index(a, va)
+                    board.set_index(b, vb)
+                    for s, table in enumerate(keys):
+                        hashes[s] ^= table[a * 10 + va] ^ table[b * 10 + vb]
+                    remaining += 2
+                continue
+
+            move = frame.moves[frame.next]
+            frame.next += 1
+            a, b = move
+            child_sleep = frozenset(
+                m for m in (*frame.sleep, *frame.done)
+                if m[0] != a and m[0] != b and m[1] != a and m[1] != b
+            )
+            frame.done.append(move)
+
+            va, vb = cells[a], cells[b]
+            board.set_index(a, EMPTY)
+            board.set_index(b, EMPTY)
+            for s, table in enumerate(keys):
+                hashes[s] ^= table[a * 10 + va] ^ table[b * 10 + vb]
+            remaining -= 2
+
+            if remaining == 0:
+                return [f.move for f in stack[1:]] + [move]
+
+            child = self._enter(board, hashes, child_sleep, move, (va, vb))
+            if child is None:
+                board.set_index(a, va)
+                board.set_index(b, vb)
+                for s, table in enumerate(keys):
+                    hashes[s] ^= table[a * 10 + va] ^ table[b * 10 + vb]
+                remaining += 2
+            else:
+                stack.append(child)
+
+        return None
+
+
+def solve(board, **options):
+    return Solver(**options).solve(board)
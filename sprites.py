@@ -0,0 +1,152 @@
+# sprites.py
+import hashlib
+import os
+import tkinter as tk
+
+from startup import PROFILE
+
+ASSETS_DIR = "assets"
+CACHE_DIR = os.path.join(ASSETS_DIR, ".cache")
+TILE_SIZE = 50
+BOARD_AREA = 320  # docelowa szerokość planszy w pikselach przy małych kafelkach
+MIN_TILE = 12
+
+
+def sprite_source(value):
+    name = "empty" if value is None else str(value)
+    return os.path.join(ASSETS_DIR, "img", f"{name}.png")
+
+
+def tile_for_board(size):
+    # Do 6x6 pełne kafelki, dla większych plansz mniejsze
+    return max(MIN_TILE, min(TILE_SIZE, BOARD_AREA // size))
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+DIGEST_INDEX = "digests.txt"
+_digest_indexes = {}  # katalog cache -> {źródło: (mtime_ns, rozmiar, skrót)}
+
+
+def _digest_index(cache_dir):
+    index = _digest_indexes.get(cache_dir)
+    if index is None:
+        index = _digest_indexes[cache_dir] = {}
+        try:
+            with open(os.path.join(cache_dir, DIGEST_INDEX), encoding="utf-8") as f:
+                for line in f:
+                    mtime, size, digest, source = line.rstrip("\n").split(" ", 3)
+                    index[source] = (int(mtime), int(size), digest)
+        except (OSError, ValueError):
+            pass  # brak albo uszkodzony indeks - skróty zostaną policzone od nowa
+    return index
+
+
+def _save_digest_index(cache_dir, index):
+    path = os.path.join(cache_dir, DIGEST_INDEX)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for source, (mtime, size, digest) in index.items():
+                f.write(f"{mtime} {size} {digest} {source}\n")
+        os.replace(tmp, path)
+    except OSError:
+        pass  # katalog tylko do odczytu - skrót policzony ponownie przy następnym starcie
+
+
+def source_digest(source, cache_dir=CACHE_DIR):
+    # sha1 liczony tylko, gdy (mtime, rozmiar) pliku różni się od zapamiętanego
+    st = os.stat(source)
+    index = _digest_index(cache_dir)
+    entry = index.get(source)
+    if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+        return entry[2]
+    digest = file_digest(source)
+    index[source] = (st.st_mtime_ns, st.st_size, digest)
+    _save_digest_index(cache_dir, index)
+    return digest
+
+
+def cached_path(source, size=None, resample=None, cache_dir=CACHE_DIR):
+    # Przeskalowana kopia w formacie PNG, nazwana skrótem źródła i rozmiarem;
+    # zmiana pliku źródłowego daje nową nazwę, stare warianty są usuwane
+    stem = os.path.splitext(os.path.basename(source))[0]
+    variant = f"{size[0]}x{size[1]}" if size else "orig"
+    if resample:
+        variant += f"-{resample}"
+    path = os.path.join(cache_dir, f"{stem}-{variant}-{source_digest(source, cache_dir)}.png")
+    if os.path.exists(path):
+        return path
+
+    from PIL import Image
+
+    os.makedirs(cache_dir, exist_ok=True)
+    img = Image.open(source)
+    if size:
+        if resample:
+            img = img.resize(size, getattr(Image.Resampling, resample.upper()))
+        else:
+            img = img.resize(size)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    img.save(tmp, format="PNG")
+    os.replace(tmp, path)
+
+    prefix = f"{stem}-{variant}-"
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith(".png") and os.path.join(cache_dir, name) != path:
+            os.remove(os.path.join(cache_dir, name))
+    return path
+
+
+def load_image(source, size=None, resample=None):
+    # tk.PhotoImage czyta PNG bez PIL; PIL potrzebny tylko przy braku w cache
+    try:
+        with PROFILE.phase("asset", source):
+            return tk.PhotoImage(file=cached_path(source, size, resample))
+    except (OSError, tk.TclError):
+        # Katalog cache tylko do odczytu albo Tk bez obsługi PNG - skalujemy w pamięci
+        from PIL import Image, ImageTk
+
+        img = Image.open(source)
+        if size:
+            img = img.resize(size, getattr(Image.Resampling, resample.upper())) if resample else img.resize(size)
+        return ImageTk.PhotoImage(img)
+
+
+# === SpriteSet Class ===
+class SpriteSet:
+    # Obrazki pól (1-9 i puste) w jednym rozmiarze, ładowane leniwie
+    # przy pierwszym użyciu danej wartości
+
+    def __init__(self, tile=TILE_SIZE):
+        self.tile = tile
+        self._images = {}
+
+    def __getitem__(self, value):
+        image = self._images.get(value)
+        if image is None:
+            image = self._images[value] = load_image(sprite_source(value), (self.tile, self.tile))
+        return image
+
+    def get(self, value, default=None):
+        if value is not None and not 1 <= value <= 9:
+            return default
+        return self[value]
+
+    def __contains__(self, value):
+        return value is None or 1 <= value <= 9
+
+
+_SPRITE_SETS = {}
+
+
+def get_sprites(tile=TILE_SIZE):
+    # Jeden zestaw na rozmiar kafelka, współdzielony przez wszystkie plansze
+    sprites = _SPRITE_SETS.get(tile)
+    if sprites is None:
+        sprites = _SPRITE_SETS[tile] = SpriteSet(tile)
+    return sprites
@@ -0,0 +1,115 @@
+# startup.py
+import json
+import sys
+import time
+from importlib import import_module
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, profiler, kind, name):
+        self.profiler = profiler
+        self.kind = kind
+        self.name = name
+
+    def __enter__(self):
+        self.depth = self.profiler._depth
+        self.profiler._depth += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ended = time.perf_counter()
+        self.profiler._depth -= 1
+        self.profiler.records.append({
+            "kind": self.kind,
+            "name": self.name,
+            "start": self.started - self.profiler.origin,
+            "seconds": ended - self.started,
+            "depth": self.depth,
+        })
+        return False
+
+
+# === Startup Profiler ===
+class StartupProfiler:
+    # Czasy importów, ładowania zasobów i budowy widżetów; wyłączony
+    # profiler zwraca wspólny pusty kontekst i nic nie zapisuje
+
+    def __init__(self):
+        self.enabled = False
+        self.records = []
+        self.origin = time.perf_counter()
+        self._depth = 0
+
+    def enable(self, origin=None):
+        self.enabled = True
+        if origin is not None:
+            self.origin = origin
+
+    def phase(self, kind, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, kind, name)
+
+    def laps(self, kind):
+        # Funkcja zapisująca czas od poprzedniego wywołania (etapy jednej metody)
+        if not self.enabled:
+            return lambda name: None
+        state = {"last": time.perf_counter()}
+
+        def lap(name):
+            now = time.perf_counter()
+            self.records.append({"kind": kind, "name": name, "start": state["last"] - self.origin,
+                                 "seconds": now - state["last"], "depth": self._depth})
+            state["last"] = now
+
+        return lap
+
+    def mark(self, name):
+        if self.enabled:
+            self.records.append({"kind": "mark", "name": name,
+                                 "start": time.perf_counter() - self.origin, "seconds": 0.0, "depth": 0})
+
+    def report(self, stream=None):
+        # Jeden obiekt JSON na linię, posortowane według czasu rozpoczęcia
+        stream = stream or sys.stdout
+        for record in sorted(self.records, key=lambda r: r["start"]):
+            stream.write(json.dumps(record) + "\n")
+        totals = {}
+        for record in self.records:
+            if record["depth"] == 0 and record["kind"] != "mark":
+                totals[record["kind"]] = totals.get(record["kind"], 0.0) + record["seconds"]
+        for kind, seconds in sorted(totals.items()):
+            stream.write(json.dumps({"kind": "total", "name": kind, "seconds": seconds}) + "\n")
+        stream.flush()
+
+
+PROFILE = StartupProfiler()
+
+
+class LazyModule:
+    # Moduł importowany dopiero przy pierwszym odwołaniu do atrybutu
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            with PROFILE.phase("import", self._name):
+                self._module = import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
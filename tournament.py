@@ -0,0 +1,320 @@
+# tournament.py
+import argparse
+import math
+import random
+import time
+import tkinter as tk
+
+from engine import RULES, REASON_STUCK, REASON_TIME, REFILL_OK, GameSession
+from game_logic import GameBoard, Position
+from render import CanvasRenderer
+from scheduler import TickScheduler
+from sprites import get_sprites
+from startup import lazy_import
+
+policies = lazy_import("policies")
+
+TILE = 24
+FRAME_MS = 16          # najwyżej jedno przerysowanie na klatkę
+MOVE_INTERVAL = 1.0    # sekundy gry między ruchami botów
+MISMATCH_BG = "salmon"
+REASON_STOPPED = "Runda zakończona."
+
+
+# === Board Panel ===
+class BoardPanel:
+    # Jedna plansza turnieju: sesja, Canvas z polami i etykieta statusu.
+    # Panel niczego nie rysuje sam - zgłasza się widokowi do najbliższej klatki.
+
+    def __init__(self, view, parent, number, player=None):
+        self.view = view
+        self.number = number
+        self.player = player  # polityka z policies albo None (gracz klika)
+        self.session = None
+        self.selected = []
+        self.finished = False
+        self._status_text = None
+
+        self.frame = tk.Frame(parent, bd=1, relief=tk.GROOVE)
+        title = f"#{number}" + (f" ({player.name})" if player is not None else "")
+        tk.Label(self.frame, text=title).pack()
+        self.renderer = CanvasRenderer(self.frame, view.sprites, self.clicked, view.tile)
+        self.status = tk.Label(self.frame, text="")
+        self.status.pack()
+        if player is None:
+            tk.Button(self.frame, text="Losuj", command=self.randomize).pack(pady=(0, 2))
+
+    def new_game(self, mode, rng):
+        self.session = GameSession(mode, board=GameBoard(self.view.size), rng=rng)
+        self.session.start()
+        self.selected.clear()
+        self.finished = self.session.over
+        self.renderer.attach(self.session.board)
+        self.view.mark(self)
+
+    @property
+    def active(self):
+        return self.view.running and not self.session.over
+
+    def clicked(self, row, col):
+        if self.player is not None or not self.active:
+            return
+        pos = Position(row, col)
+        if pos in self.selected:
+            return
+        if not self.selected:
+            self.renderer.clear_highlights()
+        self.selected.append(pos)
+        self.renderer.highlight(row, col, "lightblue")
+        if len(self.selected) == 2:
+            self.play(*self.selected)
+            self.selected.clear()
+        self.view.mark(self)
+
+    def play(self, pos1, pos2):
+        self.session.board.elapsed_time = self.view.scheduler.elapsed()
+        result = self.session.play(pos1, pos2)
+        self.renderer.clear_highlights()
+        if not result.matched:
+            # Zamiast okna z błędem (blokowałoby wszystkie plansze) - czerwone tło do następnej akcji
+            for pos in (pos1, pos2):
+                self.renderer.highlight(pos.row, pos.col, MISMATCH_BG)
+        self.changed()
+        return result
+
+    def randomize(self):
+        if not self.active:
+            return None
+        status = self.session.randomize()
+        self.selected.clear()
+        self.renderer.clear_highlights()
+        self.changed()
+        return status
+
+    def step(self):
+        # Ruch bota - ta sama ścieżka co w simulate.play_game
+        action = self.player.choose(self.session)
+        if action is None:
+            self.session.finish(REASON_STUCK)
+        elif action == policies.RANDOMIZE:
+            if self.randomize() != REFILL_OK:
+                self.session.finish(REASON_STUCK)
+        else:
+            self.play(*action)
+        self.changed()
+
+    def time_up(self, elapsed):
+        if not self.session.over:
+            self.session.board.elapsed_time = elapsed
+            self.session.finish(REASON_TIME)
+            self.changed()
+
+    def changed(self):
+        self.view.mark(self)
+        if self.session.over and not self.finished:
+            self.finished = True
+            self.view.panel_finished(self)
+
+    def status_text(self, elapsed):
+        session = self.session
+        board = session.board
+        parts = [f"{board.score} pkt", f"B: {board.errors}/{session.rules.max_errors}",
+                 f"L: {board.random_count}/{session.rules.max_randoms}"]
+        if session.moves_left is not None:
+            parts.append(f"R: {session.moves_left}")
+        if session.rules.time_limit is not None and not session.over:
+            parts.append(f"{max(0, session.rules.time_limit - int(elapsed))} s")
+        text = "  ".join(parts)
+        if session.over:
+            text += f"\n{session.reason}"
+        return text
+
+    def flush(self, elapsed):
+        self.renderer.flush()
+        text = self.status_text(elapsed)
+        if text != self._status_text:
+            self._status_text = text
+            self.status.config(text=text)
+
+
+# === Tournament View ===
+class TournamentView:
+    # Wiele plansz w jednym oknie Tk. Wspólne są: zestaw obrazków (get_sprites),
+    # jeden TickScheduler (zegar, terminy trybu timed i ruchy botów - po jednej
+    # subskrypcji na cały turniej) oraz jedna klatka rysowania dla wszystkich
+    # zmienionych plansz. Koszt stały nie rośnie z liczbą plansz; każda plansza
+    # to jeden Canvas, dwie etykiety i stan gry.
+
+    def __init__(self, root, boards=12, modes=("standard",), size=None, tile=TILE, columns=None,
+                 bots=0, policy="greedy", move_interval=MOVE_INTERVAL, seed=0, same_board=False):
+        self.root = root
+        self.root.title("SumUp - turniej")
+        self.modes = list(modes)
+        self.size = size or GameBoard.SIZE
+        self.tile = tile
+        self.sprites = get_sprites(tile)
+        self.move_interval = move_interval
+        self.seed = seed
+        self.same_board = same_board
+        self.round = 0
+        self.running = False
+        self.paused = False
+        self.frames = 0
+        self._dirty = set()
+        self._frame_id = None
+        self._active = 0
+        self.scheduler = TickScheduler(after=root.after, after_cancel=root.after_cancel)
+
+        top = tk.Frame(root)
+        top.pack(pady=5)
+        tk.Button(top, text="Nowa runda", command=self.start).pack(side=tk.LEFT, padx=5)
+        self.pause_button = tk.Button(top, text="Pauza", command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        tk.Button(top, text="Zakończ rundę", command=self.stop).pack(side=tk.LEFT, padx=5)
+        self.clock_label = tk.Label(top, text="Czas: 00:00:00")
+        self.clock_label.pack(side=tk.LEFT, padx=10)
+        self.leader_label = tk.Label(top, text="")
+        self.leader_label.pack(side=tk.LEFT, padx=10)
+        self._labels = {}
+
+        grid = tk.Frame(root)
+        grid.pack(padx=5, pady=5)
+        columns = columns or math.ceil(math.sqrt(boards))
+        rng = random.Random(seed)
+        self.panels = []
+        for i in range(boards):
+            player = policies.POLICIES[policy](random.Random(rng.getrandbits(64))) if i < bots else None
+            panel = BoardPanel(self, grid, i + 1, player)
+            panel.frame.grid(row=i // columns, column=i % columns, padx=3, pady=3)
+            self.panels.append(panel)
+
+        self.start()
+
+    # --- rundy ---
+    def start(self):
+        self.scheduler.stop()
+        self.round += 1
+        for i, panel in enumerate(self.panels):
+            # Wspólne ziarno: wszyscy dostają tę samą planszę startową i te same dolosowania
+            seed = self.seed * 1_000_003 + self.round * 7_919 + (0 if self.same_board else i)
+            panel.new_game(self.modes[i % len(self.modes)], random.Random(seed))
+        self._active = sum(not panel.session.over for panel in self.panels)
+        self.running = True
+        self.paused = False
+        self.pause_button.config(text="Pauza")
+
+        self.scheduler.every(1.0, self.tick)
+        for limit in sorted({p.session.rules.time_limit for p in self.panels} - {None}):
+            self.scheduler.at(limit, self.time_up)
+        if any(panel.player is not None for panel in self.panels):
+            self.scheduler.every(self.move_interval, self.step_bots)
+        self.scheduler.start(0.0)
+        self.tick(0.0)
+
+    def stop(self):
+        if not self.running and not self.paused:
+            return
+        self.running = False
+        self.paused = False
+        self.scheduler.stop()
+        for panel in self.panels:
+            if not panel.session.over:
+                panel.session.board.elapsed_time = self.scheduler.elapsed()
+                panel.session.finish(REASON_STOPPED)
+                panel.finished = True
+            self.mark(panel)
+        self._active = 0
+
+    def toggle_pause(self):
+        if self.paused:
+            self.paused = False
+            self.running = True
+            self.scheduler.resume()
+            self.pause_button.config(text="Pauza")
+        elif self.running:
+            self.paused = True
+            self.running = False
+            self.scheduler.pause()
+            self.pause_button.config(text="Wznów")
+
+    def panel_finished(self, panel):
+        self._active -= 1
+        if self._active <= 0 and self.running:
+            self.running = False
+            self.scheduler.stop()
+            self.mark(None)
+
+    # --- zegar ---
+    def tick(self, elapsed):
+        # Jedno wywołanie na sekundę dla wszystkich plansz: zegar i odliczanie trybu timed
+        self.set_label(self.clock_label, f"Czas: {time.strftime('%H:%M:%S', time.gmtime(int(elapsed)))}")
+        for panel in self.panels:
+            if panel.session.rules.time_limit is not None and not panel.session.over:
+                self.mark(panel)
+
+    def time_up(self, elapsed):
+        for panel in self.panels:
+            if panel.session.rules.time_limit is not None and panel.session.rules.time_limit <= elapsed:
+                panel.time_up(elapsed)
+
+    def step_bots(self, elapsed):
+        for panel in self.panels:
+            if panel.player is not None and panel.active:
+                panel.step()
+
+    # --- rysowanie ---
+    def mark(self, panel):
+        if panel is not None:
+            self._dirty.add(panel)
+        if self._frame_id is None:
+            self._frame_id = self.root.after(FRAME_MS, self.flush)
+
+    def flush(self):
+        self._frame_id = None
+        elapsed = self.scheduler.elapsed()
+        for panel in self._dirty:
+            panel.flush(elapsed)
+        self._dirty.clear()
+        self.show_leader()
+        self.frames += 1
+
+    def show_leader(self):
+        leader = max(self.panels, key=lambda p: p.session.board.score)
+        text = f"Prowadzi: #{leader.number} ({leader.session.board.score} pkt)"
+        if not self.running and self._active <= 0:
+            text = "Koniec rundy. " + text
+        self.set_label(self.leader_label, text)
+
+    def set_label(self, label, text):
+        if self._labels.get(label) != text:
+            self._labels[label] = text
+            label.config(text=text)
+
+    def standings(self):
+        ranked = sorted(self.panels, key=lambda p: (-p.session.board.score, p.session.board.errors, p.number))
+        return [dict(board=p.number, **p.session.summary()) for p in ranked]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SumUp tournament: many boards in one window")
+    parser.add_argument("--boards", type=int, default=12, help="liczba plansz")
+    parser.add_argument("--mode", action="append", choices=sorted(RULES),
+                        help="tryb gry; kilka razy - tryby na przemian (domyślnie standard)")
+    parser.add_argument("--size", type=int, default=None, help="rozmiar planszy")
+    parser.add_argument("--tile", type=int, default=TILE, help="rozmiar pola w pikselach")
+    parser.add_argument("--columns", type=int, default=None)
+    parser.add_argument("--bots", type=int, default=0, help="ile pierwszych plansz prowadzą boty")
+    parser.add_argument("--policy", default="greedy", choices=sorted(policies.POLICIES), help="strategia botów")
+    parser.add_argument("--interval", type=float, default=MOVE_INTERVAL, help="sekundy między ruchami botów")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--same-board", action="store_true", help="ta sama plansza i dolosowania dla wszystkich")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    TournamentView(root, args.boards, args.mode or ["standard"], args.size, args.tile, args.columns,
+                   args.bots, args.policy, args.interval, args.seed, args.same_board)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
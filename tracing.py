@@ -0,0 +1,204 @@
+# tracing.py
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left
+from functools import wraps
+
+# Kubełki rosnące o 2^(1/4) (~19%): od 1 µs do ~2 min, ostatni bez górnej granicy
+BUCKET_FACTOR = 2 ** 0.25
+BUCKETS = tuple(1e-6 * BUCKET_FACTOR ** i for i in range(108))
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC = "sumup_stage_seconds"
+
+
+# === Histogram ===
+class Histogram:
+    # Stała tablica liczników: zapis to jedno bisect i kilka dodawań, bez alokacji
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.counts = array("Q", bytes(8 * (len(BUCKETS) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        # Górna granica kubełka z q-tym pomiarem (nie więcej niż maksimum)
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        result = {"count": self.count, "sum": self.total, "max": self.max,
+                  "mean": self.total / self.count if self.count else None}
+        for q in QUANTILES:
+            result[f"p{round(q * 100)}"] = self.quantile(q)
+        return result
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.started)
+        return False
+
+
+def default_targets():
+    # (klasa, metoda, etap) - ścieżka kliknięcia i pozostałe akcje gracza
+    from engine import GameSession
+    from game_logic import GameBoard
+    from gui import GameGUI
+    from scheduler import TickScheduler
+
+    return [
+        (GameGUI, "block_clicked", "click"),
+        (GameGUI, "handle_match", "handle_match"),
+        (GameSession, "play", "play"),
+        (GameBoard, "is_match", "is_match"),
+        (GameBoard, "are_positions_connectable", "are_positions_connectable"),
+        (GameBoard, "is_board_empty", "is_board_empty"),
+        (GameGUI, "update_gui", "update_gui"),
+        (GameGUI, "randomize_numbers", "randomize"),
+        (GameGUI, "save_board", "save_board"),
+        (GameGUI, "load_board", "load_board"),
+        (TickScheduler, "_fire", "tick"),
+    ]
+
+
+# === Tracer ===
+class Tracer:
+    # Pomiar czasu etapów przez podmianę metod klas na czas włączenia.
+    # Wyłączony tracer przywraca oryginały, więc nie kosztuje nic.
+    # Włączać przed utworzeniem GameGUI - Tk trzyma metody związane przy tworzeniu widżetów.
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self._patched = []
+
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        return histogram
+
+    def record(self, stage, seconds):
+        if self.enabled:
+            self.histogram(stage).record(seconds)
+
+    def span(self, stage):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self.histogram(stage))
+
+    def instrument(self, owner, name, stage=None):
+        original = owner.__dict__[name]
+        histogram = self.histogram(stage or name)
+        clock = time.perf_counter
+
+        @wraps(original)
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                histogram.record(clock() - started)
+
+        setattr(owner, name, timed)
+        self._patched.append((owner, name, original))
+
+    def enable(self, targets=None):
+        if self.enabled:
+            return
+        self.enabled = True
+        for owner, name, stage in default_targets() if targets is None else targets:
+            self.instrument(owner, name, stage)
+
+    def disable(self):
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+        self.enabled = False
+
+    def reset(self):
+        # Zerowanie w miejscu - podmienione metody trzymają te same obiekty
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+    def snapshot(self):
+        return {stage: h.to_dict() for stage, h in sorted(self.histograms.items()) if h.count}
+
+    def to_json(self):
+        return json.dumps({"stages": self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        # Histogram (kubełki co potęgę dwójki, skumulowane) i podsumowanie z kwantylami
+        lines = [f"# HELP {METRIC} Time spent per interaction stage.", f"# TYPE {METRIC} histogram"]
+        for stage, h in sorted(self.histograms.items()):
+            if not h.count:
+                continue
+            seen = 0
+            for i, n in enumerate(h.counts[:len(BUCKETS)]):
+                seen += n
+                if i % 4 == 0:
+                    lines.append(f'{METRIC}_bucket{{stage="{stage}",le="{BUCKETS[i]:.6g}"}} {seen}')
+            lines.append(f'{METRIC}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'{METRIC}_sum{{stage="{stage}"}} {h.total:.9f}')
+            lines.append(f'{METRIC}_count{{stage="{stage}"}} {h.count}')
+        summary = f"{METRIC}_quantiles"
+        lines += [f"# HELP {summary} Estimated latency quantiles per stage.", f"# TYPE {summary} summary"]
+        for stage, h in sorted(self.histograms.items()):
+            if not h.count:
+                continue
+            for q in QUANTILES:
+                lines.append(f'{summary}{{stage="{stage}",quantile="{q}"}} {h.quantile(q):.9f}')
+            lines.append(f'{summary}_sum{{stage="{stage}"}} {h.total:.9f}')
+            lines.append(f'{summary}_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        # Format według rozszerzenia: .prom/.txt - tekst Prometheusa, inaczej JSON
+        text = self.to_prometheus() if os.path.splitext(path)[1] in (".prom", ".txt") else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+TRACER = Tracer()